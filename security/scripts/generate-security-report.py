@@ -10,10 +10,30 @@ import os
 import sys
 import glob
 import argparse
+import heapq
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 import base64
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# Severity rank used to order findings; unknown severities sort with 'low'
+_SEVERITY_ORDER = defaultdict(lambda: 3, {'critical': 0, 'high': 1, 'medium': 2, 'low': 3})
+
+# Bound format method for a single findings table row, built once at import
+_FINDING_ROW = """
+            <tr>
+                <td class="severity-{severity_class}">{severity}</td>
+                <td>{type}</td>
+                <td>{source}</td>
+                <td>{description}</td>
+            </tr>
+            """.format
+
 class SecurityReportGenerator:
     def __init__(self, input_dir, output_file, report_format='html'):
         self.input_dir = Path(input_dir)
@@ -707,36 +727,36 @@ class SecurityReportGenerator:
 
     def _generate_owasp_cards(self):
         """Generate OWASP Top 10 cards HTML"""
-        cards_html = ""
+        cards = []
         
         for owasp_id, owasp_info in self.owasp_top10.items():
             if owasp_id in self.report_data['owasp_top10_coverage']:
                 findings = self.report_data['owasp_top10_coverage'][owasp_id]['findings']
-                cards_html += f"""
+                cards.append(f"""
                 <div class="owasp-card">
                     <h4>{owasp_id}: {owasp_info['name']}</h4>
                     <p><strong>Findings:</strong> {findings}</p>
                     <p>{owasp_info['description']}</p>
                 </div>
-                """
+                """)
             else:
-                cards_html += f"""
+                cards.append(f"""
                 <div class="owasp-card" style="border-left-color: #28a745; opacity: 0.7;">
                     <h4>{owasp_id}: {owasp_info['name']}</h4>
                     <p><strong>Status:</strong> ✅ No vulnerabilities found</p>
                     <p>{owasp_info['description']}</p>
                 </div>
-                """
+                """)
         
-        return cards_html
+        return ''.join(cards)
 
     def _generate_recommendations_html(self):
         """Generate recommendations HTML"""
-        recommendations_html = ""
+        recommendations = []
         
         for rec in self.report_data['recommendations']:
             priority_class = rec['priority'].lower()
-            recommendations_html += f"""
+            recommendations.append(f"""
             <div class="recommendation {priority_class}">
                 <div class="priority-badge {priority_class}">{rec['priority']} Priority</div>
                 <h4>{rec['title']}</h4>
@@ -747,59 +767,63 @@ class SecurityReportGenerator:
                     {''.join(f'<li>{action}</li>' for action in rec['actions'])}
                 </ul>
             </div>
-            """
+            """)
         
-        return recommendations_html
+        return ''.join(recommendations)
 
     def _generate_findings_table(self):
         """Generate detailed findings table HTML"""
-        table_html = ""
-        
-        # Sort findings by severity
-        severity_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
-        sorted_findings = sorted(
-            self.report_data['detailed_findings'],
-            key=lambda x: severity_order.get(x.get('severity', 'low').lower(), 3)
-        )
-        
-        for finding in sorted_findings[:50]:  # Limit to first 50 findings
-            severity = finding.get('severity', 'Low').lower()
-            table_html += f"""
-            <tr>
-                <td class="severity-{severity}">{finding.get('severity', 'Low')}</td>
-                <td>{finding.get('type', 'Unknown')}</td>
-                <td>{finding.get('source', 'Unknown')}</td>
-                <td>{finding.get('description', 'No description available')}</td>
-            </tr>
-            """
+        rows = []
+        
+        # Select the 50 most severe findings, ranking each finding once up
+        # front. The index keeps equal ranks in their original order without
+        # ever comparing the finding dicts themselves.
+        ranked_findings = heapq.nsmallest(50, (
+            (_SEVERITY_ORDER[str(finding.get('severity', 'low')).lower()], index, finding)
+            for index, finding in enumerate(self.report_data['detailed_findings'])
+        ))
+
+        for _, _, finding in ranked_findings:  # Limit to first 50 findings
+            severity = finding.get('severity', 'Low')
+            rows.append(_FINDING_ROW(
+                severity_class=severity.lower(),
+                severity=severity,
+                type=finding.get('type', 'Unknown'),
+                source=finding.get('source', 'Unknown'),
+                description=finding.get('description', 'No description available'),
+            ))
         
         if len(self.report_data['detailed_findings']) > 50:
-            table_html += f"""
+            rows.append(f"""
             <tr>
                 <td colspan="4" style="text-align: center; font-style: italic;">
                     ... and {len(self.report_data['detailed_findings']) - 50} more findings. 
                     See detailed reports for complete list.
                 </td>
             </tr>
-            """
+            """)
         
-        return table_html
+        return ''.join(rows)
 
     def generate_json_report(self):
-        """Generate JSON report"""
+        """Generate JSON report as UTF-8 encoded bytes"""
         self.generate_executive_summary()
         self.generate_recommendations()
-        return json.dumps(self.report_data, indent=2)
+        if orjson is not None:
+            return orjson.dumps(self.report_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(self.report_data, indent=2).encode('utf-8')
 
     def save_report(self):
         """Save report in specified format"""
         if self.format.lower() == 'html':
             html_content = self.generate_html_report()
-            with open(self.output_file, 'w', encoding='utf-8') as f:
+            # The report is fully materialized above, so it goes out in a
+            # single write through a large buffer.
+            with open(self.output_file, 'w', encoding='utf-8', buffering=1024 * 1024) as f:
                 f.write(html_content)
         elif self.format.lower() == 'json':
             json_content = self.generate_json_report()
-            with open(self.output_file, 'w', encoding='utf-8') as f:
+            with open(self.output_file, 'wb') as f:
                 f.write(json_content)
         else:
             raise ValueError(f"Unsupported format: {self.format}")
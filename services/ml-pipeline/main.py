@@ -1,46 +1,85 @@
 import asyncio
 import logging
+import os
+import time
 from contextlib import asynccontextmanager
-from datetime import datetime
-from typing import Dict, Any
+from datetime import datetime, timezone
+from typing import Dict, Any, List
 
+import orjson
 import uvicorn
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from brotli_asgi import BrotliMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter, ValidationError
+from prometheus_client import CollectorRegistry, generate_latest, multiprocess, CONTENT_TYPE_LATEST
 from starlette.responses import Response
 
 from src.config import settings
-from src.database import database, engine, metadata
-from src.models import PredictionRequest, PredictionResponse, TrainingRequest, ModelInfo
+from src.database import database
+from src.models import (
+    PredictionRequest, PredictionResponse, BatchPredictionRequest, BatchPredictionResponse, TrainingRequest, ModelInfo
+)
 from src.ml_service import MLService
-from src.monitoring import setup_monitoring, logger
-from src.exceptions import MLServiceException
+from src.monitoring import (
+    setup_monitoring, logger, ml_predictions_total, ml_prediction_duration, ml_training_jobs_total
+)
+from src.exceptions import InvalidFeatureError, MLServiceException
+
+# Metrics (declared in src.monitoring; redeclaring them here would register
+# the same names twice on the default registry)
+PREDICTION_COUNTER = ml_predictions_total
+PREDICTION_DURATION = ml_prediction_duration
+TRAINING_COUNTER = ml_training_jobs_total
+
+# Label children for the fixed predict endpoints, bound once instead of per request
+USER_BEHAVIOR_TIMER = PREDICTION_DURATION.labels(model_type='user_behavior')
+USER_BEHAVIOR_SUCCESS = PREDICTION_COUNTER.labels(model_type='user_behavior', status='success')
+USER_BEHAVIOR_ERROR = PREDICTION_COUNTER.labels(model_type='user_behavior', status='error')
+PROJECT_SUCCESS_TIMER = PREDICTION_DURATION.labels(model_type='project_success')
+PROJECT_SUCCESS_SUCCESS = PREDICTION_COUNTER.labels(model_type='project_success', status='success')
+PROJECT_SUCCESS_ERROR = PREDICTION_COUNTER.labels(model_type='project_success', status='error')
+RESOURCE_USAGE_TIMER = PREDICTION_DURATION.labels(model_type='resource_usage')
+RESOURCE_USAGE_SUCCESS = PREDICTION_COUNTER.labels(model_type='resource_usage', status='success')
+RESOURCE_USAGE_ERROR = PREDICTION_COUNTER.labels(model_type='resource_usage', status='error')
+ANOMALY_DETECTION_TIMER = PREDICTION_DURATION.labels(model_type='anomaly_detection')
+ANOMALY_DETECTION_SUCCESS = PREDICTION_COUNTER.labels(model_type='anomaly_detection', status='success')
+ANOMALY_DETECTION_ERROR = PREDICTION_COUNTER.labels(model_type='anomaly_detection', status='error')
+
+# Probe endpoints reuse the last health check result, since k8s polls them
+# far more often than Redis and Postgres health meaningfully changes.
+HEALTH_CHECK_TTL = 2.0  # seconds
+
+# Rendered exposition is reused between scrapes; a few seconds of lag is
+# well inside the usual 15s scrape interval.
+METRICS_CACHE_TTL = 5.0  # seconds
+_metrics_cache = None
 
-# Metrics
-PREDICTION_COUNTER = Counter('ml_predictions_total', 'Total number of predictions made', ['model_type', 'status'])
-PREDICTION_DURATION = Histogram('ml_prediction_duration_seconds', 'Time spent on predictions', ['model_type'])
-TRAINING_COUNTER = Counter('ml_training_jobs_total', 'Total number of training jobs', ['model_type', 'status'])
+def _render_metrics() -> bytes:
+    """Render the Prometheus exposition, aggregating workers in multiprocess mode"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Starting ML Pipeline Service")
     
-    # Connect to database
-    await database.connect()
-    
-    # Create tables
-    metadata.create_all(bind=engine)
-    
-    # Initialize ML service
+    # Connect to database (schema is managed by `alembic upgrade head` at deploy time)
+    # and initialize the ML service concurrently
     app.state.ml_service = MLService()
-    await app.state.ml_service.initialize()
+    await asyncio.gather(database.connect(), app.state.ml_service.initialize())
     
     # Setup monitoring
     setup_monitoring()
     
+    app.state.health_cache = None
+    
     logger.info("✅ ML Pipeline Service started successfully")
     
     yield
@@ -60,6 +99,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -72,27 +112,71 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Brotli at a low quality level compresses JSON about as well as gzip -9
+# for a fraction of the CPU; clients without br support still get gzip.
+app.add_middleware(BrotliMiddleware, minimum_size=1000, quality=4)
 
-# Dependency to get ML service
-def get_ml_service():
-    return app.state.ml_service
+# Dependency to get ML service (Request is injected without extra resolution)
+def get_ml_service(request: Request):
+    return request.app.state.ml_service
+
+# Prediction endpoints build their payload directly instead of going through
+# response_model validation; the schema is still published in OpenAPI.
+PREDICTION_RESPONSES = {200: {"model": PredictionResponse}}
+
+# Prediction bodies are validated straight from the raw JSON bytes by
+# pydantic-core rather than parsed to dicts first; the schema is published
+# explicitly since FastAPI no longer sees a body parameter.
+PREDICTION_REQUEST_ADAPTER = TypeAdapter(PredictionRequest)
+PREDICTION_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": PredictionRequest.model_json_schema()}}
+    }
+}
+
+async def parse_prediction_request(request: Request) -> PredictionRequest:
+    try:
+        return PREDICTION_REQUEST_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        # Same error locations FastAPI reports for body parameters
+        raise RequestValidationError([
+            {**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)
+        ])
+
+def _prediction_response(model_type: str, result: Dict[str, Any]) -> ORJSONResponse:
+    """Serialize a prediction result in the PredictionResponse shape"""
+    return ORJSONResponse({
+        "prediction_id": result["prediction_id"],
+        "model_type": model_type,
+        "predictions": result["predictions"],
+        "confidence_scores": result["confidence_scores"],
+        "metadata": result["metadata"],
+        "timestamp": datetime.now(timezone.utc)
+    })
 
 # Health endpoints
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     try:
-        ml_service = get_ml_service()
-        health_status = await ml_service.health_check()
+        now = time.monotonic()
+        cached = app.state.health_cache
+        if cached and now - cached[0] < HEALTH_CHECK_TTL:
+            health_status = cached[1]
+        else:
+            ml_service = app.state.ml_service
+            health_status = await ml_service.health_check()
+            app.state.health_cache = (now, health_status)
         
-        return {
+        # Returned directly so orjson formats the timestamp without jsonable_encoder
+        return ORJSONResponse({
             "status": "healthy" if health_status["healthy"] else "unhealthy",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc),
             "service": "ml-pipeline",
             "version": "1.0.0",
             "checks": health_status
-        }
+        })
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         raise HTTPException(status_code=503, detail="Service unhealthy")
@@ -100,26 +184,31 @@ async def health_check():
 @app.get("/ready")
 async def readiness_check():
     """Readiness check endpoint"""
-    return {
+    return ORJSONResponse({
         "status": "ready",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.now(timezone.utc),
         "service": "ml-pipeline"
-    }
+    })
 
 # Metrics endpoint
 @app.get("/metrics")
 async def metrics():
     """Prometheus metrics endpoint"""
-    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    global _metrics_cache
+    now = time.monotonic()
+    if _metrics_cache is None or now - _metrics_cache[0] >= METRICS_CACHE_TTL:
+        # Rendering walks every metric; keep it off the event loop
+        _metrics_cache = (now, await asyncio.to_thread(_render_metrics))
+    return Response(_metrics_cache[1], media_type=CONTENT_TYPE_LATEST)
 
 # ML Prediction endpoints
-@app.post("/predict/user-behavior", response_model=PredictionResponse)
+@app.post("/predict/user-behavior", responses=PREDICTION_RESPONSES, openapi_extra=PREDICTION_REQUEST_BODY)
 async def predict_user_behavior(
-    request: PredictionRequest,
+    request: PredictionRequest = Depends(parse_prediction_request),
     ml_service: MLService = Depends(get_ml_service)
 ):
     """Predict user behavior patterns"""
-    with PREDICTION_DURATION.labels(model_type='user_behavior').time():
+    with USER_BEHAVIOR_TIMER.time():
         try:
             logger.info(f"Starting user behavior prediction for user: {request.user_id}")
             
@@ -129,30 +218,28 @@ async def predict_user_behavior(
                 model_version=request.model_version
             )
             
-            PREDICTION_COUNTER.labels(model_type='user_behavior', status='success').inc()
+            USER_BEHAVIOR_SUCCESS.inc()
             
             logger.info(f"User behavior prediction completed successfully for user: {request.user_id}")
             
-            return PredictionResponse(
-                prediction_id=result["prediction_id"],
-                model_type="user_behavior",
-                predictions=result["predictions"],
-                confidence_scores=result["confidence_scores"],
-                metadata=result["metadata"]
-            )
+            return _prediction_response("user_behavior", result)
             
+        except InvalidFeatureError:
+            # Rendered as a 400 naming the rejected features by the MLServiceException handler
+            USER_BEHAVIOR_ERROR.inc()
+            raise
         except Exception as e:
-            PREDICTION_COUNTER.labels(model_type='user_behavior', status='error').inc()
+            USER_BEHAVIOR_ERROR.inc()
             logger.error(f"User behavior prediction failed: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/predict/project-success", response_model=PredictionResponse)
+@app.post("/predict/project-success", responses=PREDICTION_RESPONSES, openapi_extra=PREDICTION_REQUEST_BODY)
 async def predict_project_success(
-    request: PredictionRequest,
+    request: PredictionRequest = Depends(parse_prediction_request),
     ml_service: MLService = Depends(get_ml_service)
 ):
     """Predict project success probability"""
-    with PREDICTION_DURATION.labels(model_type='project_success').time():
+    with PROJECT_SUCCESS_TIMER.time():
         try:
             logger.info(f"Starting project success prediction for project: {request.project_id}")
             
@@ -162,28 +249,26 @@ async def predict_project_success(
                 model_version=request.model_version
             )
             
-            PREDICTION_COUNTER.labels(model_type='project_success', status='success').inc()
+            PROJECT_SUCCESS_SUCCESS.inc()
             
-            return PredictionResponse(
-                prediction_id=result["prediction_id"],
-                model_type="project_success",
-                predictions=result["predictions"],
-                confidence_scores=result["confidence_scores"],
-                metadata=result["metadata"]
-            )
+            return _prediction_response("project_success", result)
             
+        except InvalidFeatureError:
+            # Rendered as a 400 naming the rejected features by the MLServiceException handler
+            PROJECT_SUCCESS_ERROR.inc()
+            raise
         except Exception as e:
-            PREDICTION_COUNTER.labels(model_type='project_success', status='error').inc()
+            PROJECT_SUCCESS_ERROR.inc()
             logger.error(f"Project success prediction failed: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/predict/resource-usage", response_model=PredictionResponse)
+@app.post("/predict/resource-usage", responses=PREDICTION_RESPONSES, openapi_extra=PREDICTION_REQUEST_BODY)
 async def predict_resource_usage(
-    request: PredictionRequest,
+    request: PredictionRequest = Depends(parse_prediction_request),
     ml_service: MLService = Depends(get_ml_service)
 ):
     """Predict future resource usage"""
-    with PREDICTION_DURATION.labels(model_type='resource_usage').time():
+    with RESOURCE_USAGE_TIMER.time():
         try:
             logger.info("Starting resource usage prediction")
             
@@ -193,28 +278,22 @@ async def predict_resource_usage(
                 model_version=request.model_version
             )
             
-            PREDICTION_COUNTER.labels(model_type='resource_usage', status='success').inc()
+            RESOURCE_USAGE_SUCCESS.inc()
             
-            return PredictionResponse(
-                prediction_id=result["prediction_id"],
-                model_type="resource_usage",
-                predictions=result["predictions"],
-                confidence_scores=result["confidence_scores"],
-                metadata=result["metadata"]
-            )
+            return _prediction_response("resource_usage", result)
             
         except Exception as e:
-            PREDICTION_COUNTER.labels(model_type='resource_usage', status='error').inc()
+            RESOURCE_USAGE_ERROR.inc()
             logger.error(f"Resource usage prediction failed: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/predict/anomaly-detection", response_model=PredictionResponse)
+@app.post("/predict/anomaly-detection", responses=PREDICTION_RESPONSES, openapi_extra=PREDICTION_REQUEST_BODY)
 async def detect_anomalies(
-    request: PredictionRequest,
+    request: PredictionRequest = Depends(parse_prediction_request),
     ml_service: MLService = Depends(get_ml_service)
 ):
     """Detect anomalies in system behavior"""
-    with PREDICTION_DURATION.labels(model_type='anomaly_detection').time():
+    with ANOMALY_DETECTION_TIMER.time():
         try:
             logger.info("Starting anomaly detection")
             
@@ -224,21 +303,52 @@ async def detect_anomalies(
                 model_version=request.model_version
             )
             
-            PREDICTION_COUNTER.labels(model_type='anomaly_detection', status='success').inc()
+            ANOMALY_DETECTION_SUCCESS.inc()
             
-            return PredictionResponse(
-                prediction_id=result["prediction_id"],
-                model_type="anomaly_detection",
-                predictions=result["predictions"],
-                confidence_scores=result["confidence_scores"],
-                metadata=result["metadata"]
-            )
+            return _prediction_response("anomaly_detection", result)
             
+        except InvalidFeatureError:
+            # Rendered as a 400 naming the rejected features by the MLServiceException handler
+            ANOMALY_DETECTION_ERROR.inc()
+            raise
         except Exception as e:
-            PREDICTION_COUNTER.labels(model_type='anomaly_detection', status='error').inc()
+            ANOMALY_DETECTION_ERROR.inc()
             logger.error(f"Anomaly detection failed: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict/anomaly-detection/batch", responses={200: {"model": BatchPredictionResponse}})
+async def detect_anomalies_batch(
+    request: BatchPredictionRequest,
+    ml_service: MLService = Depends(get_ml_service)
+):
+    """Detect anomalies for a batch of feature sets"""
+    try:
+        logger.info(f"Starting anomaly detection for {len(request.features)} feature sets")
+        
+        result = await ml_service.detect_anomalies_batch(
+            features=request.features,
+            threshold=request.threshold,
+            model_version=request.model_version
+        )
+        
+        ANOMALY_DETECTION_SUCCESS.inc(len(request.features))
+        
+        return ORJSONResponse({
+            "model_type": "anomaly_detection",
+            "results": result["results"],
+            "metadata": result["metadata"],
+            "timestamp": datetime.now(timezone.utc)
+        })
+        
+    except InvalidFeatureError:
+        # Rendered as a 400 with the failing rows by the MLServiceException handler
+        ANOMALY_DETECTION_ERROR.inc(len(request.features))
+        raise
+    except Exception as e:
+        ANOMALY_DETECTION_ERROR.inc(len(request.features))
+        logger.error(f"Batch anomaly detection failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Model Management endpoints
 @app.post("/models/train")
 async def train_model(
@@ -272,7 +382,44 @@ async def train_model(
         logger.error(f"Failed to start training job: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/models/{model_type}/info", response_model=ModelInfo)
+@app.post("/models/train/bulk")
+async def train_models_bulk(
+    requests: List[TrainingRequest],
+    ml_service: MLService = Depends(get_ml_service)
+):
+    """Start several model training jobs at once"""
+    try:
+        logger.info(f"Starting {len(requests)} training jobs")
+        
+        job_ids = await ml_service.start_training_jobs_bulk([
+            {
+                "model_type": request.model_type,
+                "training_data": request.training_data,
+                "hyperparameters": request.hyperparameters,
+                "validation_split": request.validation_split,
+                "cross_validation": request.cross_validation
+            }
+            for request in requests
+        ])
+        
+        for request in requests:
+            TRAINING_COUNTER.labels(model_type=request.model_type, status='started').inc()
+        
+        return {
+            "jobs": [
+                {"job_id": job_id, "model_type": request.model_type, "status": "started"}
+                for job_id, request in zip(job_ids, requests)
+            ],
+            "message": f"{len(job_ids)} training jobs started successfully"
+        }
+        
+    except Exception as e:
+        for request in requests:
+            TRAINING_COUNTER.labels(model_type=request.model_type, status='error').inc()
+        logger.error(f"Failed to start training jobs: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/models/{model_type}/info", responses={200: {"model": ModelInfo}})
 async def get_model_info(
     model_type: str,
     ml_service: MLService = Depends(get_ml_service)
@@ -280,7 +427,9 @@ async def get_model_info(
     """Get model information"""
     try:
         info = await ml_service.get_model_info(model_type)
-        return ModelInfo(**info)
+        # Validated once here; returning the response directly skips
+        # FastAPI's second pass through response_model
+        return ORJSONResponse(ModelInfo.model_validate(info).model_dump())
         
     except Exception as e:
         logger.error(f"Failed to get model info: {e}")
@@ -437,9 +586,11 @@ async def cancel_job(
 @app.exception_handler(MLServiceException)
 async def ml_service_exception_handler(request, exc: MLServiceException):
     logger.error(f"ML Service error: {exc}")
+    # Splice in the exception's cached details encoding rather than re-encoding it
     return Response(
+        content=b'{"error":%s,"details":%s}' % (orjson.dumps(exc.message), exc.details_json),
         status_code=exc.status_code,
-        content={"error": exc.message, "details": exc.details}
+        media_type="application/json"
     )
 
 if __name__ == "__main__":
@@ -447,6 +598,10 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=8080,
-        reload=True,
-        log_level="info"
+        # The reloader only makes sense locally and can't be combined with workers
+        reload=settings.DEBUG,
+        workers=1 if settings.DEBUG else settings.MODEL_SERVER_WORKERS,
+        loop="uvloop",
+        http="httptools",
+        log_level=settings.LOG_LEVEL.lower()
     )
\ No newline at end of file
@@ -0,0 +1,51 @@
+from logging.config import fileConfig
+
+import sqlalchemy as sa
+from alembic import context
+
+from src.config import settings
+from src.database import metadata
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = metadata
+
+def run_migrations_offline():
+    """Emit migration SQL without connecting to the database"""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    
+    with context.begin_transaction():
+        context.run_migrations()
+
+# Arbitrary application-wide key for pg_advisory_xact_lock
+MIGRATION_LOCK_KEY = 0x6D6C5F6D69677261
+
+def run_migrations_online():
+    """Apply migrations over a short-lived synchronous connection
+    
+    Every replica's init container runs this at once; on PostgreSQL a
+    transaction-scoped advisory lock makes the others wait, and they then
+    find the schema already at head.
+    """
+    connectable = sa.create_engine(settings.DATABASE_URL, poolclass=sa.pool.NullPool)
+    
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        
+        with context.begin_transaction():
+            if connection.dialect.name == "postgresql":
+                connection.execute(sa.text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
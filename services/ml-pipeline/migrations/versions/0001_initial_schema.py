@@ -0,0 +1,117 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-06-01 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def _create_table(name, *columns):
+    # Databases from before Alembic were built by metadata.create_all and
+    # already have these tables; adopt them as the baseline instead
+    if not sa.inspect(op.get_bind()).has_table(name):
+        op.create_table(name, *columns)
+
+def upgrade():
+    _create_table(
+        "ml_models",
+        sa.Column("id", sa.String, primary_key=True),
+        sa.Column("model_type", sa.String, nullable=False),
+        sa.Column("version", sa.String, nullable=False),
+        sa.Column("status", sa.String, nullable=False),
+        sa.Column("performance_metrics", sa.JSON),
+        sa.Column("training_date", sa.DateTime),
+        sa.Column("deployment_date", sa.DateTime),
+        sa.Column("feature_names", sa.JSON),
+        sa.Column("target_names", sa.JSON),
+        sa.Column("hyperparameters", sa.JSON),
+        sa.Column("model_path", sa.String),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    
+    _create_table(
+        "predictions",
+        sa.Column("id", sa.String, primary_key=True),
+        sa.Column("model_id", sa.String, sa.ForeignKey("ml_models.id")),
+        sa.Column("model_type", sa.String, nullable=False),
+        sa.Column("user_id", sa.String),
+        sa.Column("project_id", sa.String),
+        sa.Column("features", sa.JSON, nullable=False),
+        sa.Column("predictions", sa.JSON, nullable=False),
+        sa.Column("confidence_scores", sa.JSON),
+        sa.Column("metadata", sa.JSON),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    
+    _create_table(
+        "training_jobs",
+        sa.Column("id", sa.String, primary_key=True),
+        sa.Column("model_type", sa.String, nullable=False),
+        sa.Column("status", sa.String, nullable=False),
+        sa.Column("progress", sa.Float),
+        sa.Column("training_config", sa.JSON),
+        sa.Column("hyperparameters", sa.JSON),
+        sa.Column("performance_metrics", sa.JSON),
+        sa.Column("error_message", sa.Text),
+        sa.Column("results", sa.JSON),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime),
+        sa.Column("completed_at", sa.DateTime),
+    )
+    
+    _create_table(
+        "data_ingestion_jobs",
+        sa.Column("id", sa.String, primary_key=True),
+        sa.Column("source", sa.String, nullable=False),
+        sa.Column("data_type", sa.String, nullable=False),
+        sa.Column("status", sa.String, nullable=False),
+        sa.Column("progress", sa.Float),
+        sa.Column("source_config", sa.JSON),
+        sa.Column("target_location", sa.String),
+        sa.Column("transformation_rules", sa.JSON),
+        sa.Column("records_processed", sa.Integer),
+        sa.Column("error_message", sa.Text),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime),
+        sa.Column("completed_at", sa.DateTime),
+    )
+    
+    _create_table(
+        "feature_stores",
+        sa.Column("id", sa.String, primary_key=True),
+        sa.Column("feature_group", sa.String, nullable=False),
+        sa.Column("feature_name", sa.String, nullable=False),
+        sa.Column("feature_type", sa.String, nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("feature_definition", sa.JSON),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    
+    _create_table(
+        "model_performance_logs",
+        sa.Column("id", sa.String, primary_key=True),
+        sa.Column("model_id", sa.String, sa.ForeignKey("ml_models.id")),
+        sa.Column("model_type", sa.String, nullable=False),
+        sa.Column("period", sa.String, nullable=False),
+        sa.Column("metrics", sa.JSON),
+        sa.Column("drift_detection", sa.JSON),
+        sa.Column("prediction_distribution", sa.JSON),
+        sa.Column("error_analysis", sa.JSON),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+    )
+
+def downgrade():
+    op.drop_table("model_performance_logs")
+    op.drop_table("feature_stores")
+    op.drop_table("data_ingestion_jobs")
+    op.drop_table("training_jobs")
+    op.drop_table("predictions")
+    op.drop_table("ml_models")
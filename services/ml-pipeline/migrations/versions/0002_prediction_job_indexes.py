@@ -0,0 +1,22 @@
+"""Index hot query columns on predictions and training_jobs
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-06-15 00:00:00
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index("ix_predictions_model_type_created_at", "predictions", ["model_type", "created_at"])
+    op.create_index("ix_predictions_user_id", "predictions", ["user_id"])
+    op.create_index("ix_training_jobs_status_created_at", "training_jobs", ["status", "created_at"])
+
+def downgrade():
+    op.drop_index("ix_training_jobs_status_created_at", table_name="training_jobs")
+    op.drop_index("ix_predictions_user_id", table_name="predictions")
+    op.drop_index("ix_predictions_model_type_created_at", table_name="predictions")
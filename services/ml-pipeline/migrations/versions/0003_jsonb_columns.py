@@ -0,0 +1,33 @@
+"""Store queried JSON columns as JSONB and index prediction features
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-07-01 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+JSONB_COLUMNS = [
+    ("ml_models", "performance_metrics"),
+    ("predictions", "features"),
+    ("training_jobs", "performance_metrics"),
+    ("model_performance_logs", "metrics"),
+]
+
+def upgrade():
+    for table, column in JSONB_COLUMNS:
+        op.alter_column(table, column, type_=JSONB, postgresql_using=f"{column}::jsonb")
+    
+    op.create_index("ix_predictions_features_gin", "predictions", ["features"], postgresql_using="gin")
+
+def downgrade():
+    op.drop_index("ix_predictions_features_gin", table_name="predictions")
+    
+    for table, column in JSONB_COLUMNS:
+        op.alter_column(table, column, type_=sa.JSON, postgresql_using=f"{column}::json")
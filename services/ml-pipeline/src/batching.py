@@ -0,0 +1,82 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+class BatchedPredictor:
+    """Coalesces concurrent single-row predictions into one model call
+    
+    Callers submit one feature row each; a single background task collects up
+    to ``max_batch_size`` rows (or whatever arrived within ``max_wait``
+    seconds), stacks them and runs ``predict_fn`` once in ``executor`` (the
+    loop's default executor if None), then hands each caller back its own row
+    of the output.
+    """
+    
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], Any],
+        max_batch_size: int = 64,
+        max_wait: float = 0.002,
+        executor: Optional[Executor] = None
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.executor = executor
+        self.queue = asyncio.Queue()
+        self._task = None
+    
+    async def start(self):
+        """Start the background batching task"""
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Serve everything queued so far and stop the batcher"""
+        if self._task is None:
+            return
+        await self.queue.put(None)
+        await self._task
+        self._task = None
+    
+    async def submit(self, feature_vector) -> np.ndarray:
+        """Queue one feature row and wait for its prediction"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((feature_vector, future))
+        return await future
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch = []
+            item = await self.queue.get()
+            deadline = loop.time() + self.max_wait
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.max_batch_size:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout=max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                stopping = True
+            
+            if batch:
+                await self._predict(loop, batch)
+    
+    async def _predict(self, loop, batch):
+        try:
+            features = np.vstack([feature_vector for feature_vector, _ in batch], dtype=np.float32)
+            outputs = await loop.run_in_executor(self.executor, self.predict_fn, features)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for row, (_, future) in zip(outputs, batch):
+            if not future.done():
+                future.set_result(row)
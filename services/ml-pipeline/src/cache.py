@@ -0,0 +1,224 @@
+import asyncio
+import functools
+import inspect
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+import xxhash
+import zstandard
+
+from .config import settings
+from .monitoring import logger, prediction_cache_hits, prediction_cache_misses
+
+class PredictionCache:
+    """Cache-aside store for prediction results in Redis
+    
+    Entries hold everything in a prediction response except its
+    prediction_id. Redis errors are logged and treated as misses, as are
+    entries that fail to decode (which are also deleted), so the cache can
+    never fail a prediction. ``inflight`` maps keys being looked
+    up or computed in this process to a future of their entry.
+    
+    Recently used entries are also kept in process for up to ``local_ttl``
+    seconds (``local_size`` at most, least recently used evicted first), so
+    repeated queries skip the Redis round trip. Entries serialised to at
+    least ``compress_min`` bytes are stored zstd-compressed.
+    """
+    
+    def __init__(
+        self,
+        redis_client,
+        ttl: int = settings.PREDICTION_CACHE_TTL,
+        lock_timeout: int = 5000,
+        wait_attempts: int = 10,
+        wait_interval: float = 0.02,
+        local_size: int = settings.PREDICTION_CACHE_LOCAL_SIZE,
+        local_ttl: float = settings.PREDICTION_CACHE_LOCAL_TTL,
+        compress_min: int = settings.PREDICTION_CACHE_COMPRESS_MIN
+    ):
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout  # milliseconds
+        self.wait_attempts = wait_attempts
+        self.wait_interval = wait_interval  # seconds
+        self.local_size = local_size
+        self.local_ttl = local_ttl  # seconds
+        self.compress_min = compress_min  # bytes
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.compressor = zstandard.ZstdCompressor(level=1)
+        self.decompressor = zstandard.ZstdDecompressor()
+    
+    @staticmethod
+    def key(model_type: str, version: str, arguments: Dict[str, Any]) -> str:
+        """Hash the canonicalised call arguments into a cache key for the serving model version"""
+        payload = orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        return f"prediction:{model_type}:{version}:{xxhash.xxh3_128_hexdigest(payload)}"
+    
+    def _encode(self, value: Dict[str, Any]) -> bytes:
+        payload = orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+        if len(payload) >= self.compress_min:
+            return self.compressor.compress(payload)
+        return payload
+    
+    def _decode(self, cached: bytes) -> Dict[str, Any]:
+        # Plain entries are JSON objects; anything else is a zstd frame
+        if cached[:1] != b"{":
+            cached = self.decompressor.decompress(cached)
+        value = orjson.loads(cached)
+        if not isinstance(value, dict):
+            raise ValueError(f"expected a JSON object, got {type(value).__name__}")
+        return value
+    
+    def _remember(self, key: str, value: Dict[str, Any]):
+        self.local[key] = (time.monotonic() + self.local_ttl, value)
+        self.local.move_to_end(key)
+        if len(self.local) > self.local_size:
+            self.local.popitem(last=False)
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        local = self.local.get(key)
+        if local is not None:
+            expires_at, value = local
+            if expires_at > time.monotonic():
+                self.local.move_to_end(key)
+                return value
+            del self.local[key]
+        
+        try:
+            cached = await self.redis_client.get(key)
+        except Exception as e:
+            logger.warning(f"Prediction cache read failed: {e}")
+            return None
+        if cached is None:
+            return None
+        
+        try:
+            value = self._decode(cached)
+        except (zstandard.ZstdError, ValueError) as e:
+            # Truncated or foreign entries are dropped and recomputed
+            logger.warning(f"Discarding undecodable prediction cache entry {key}: {e}")
+            await self.discard(key)
+            return None
+        self._remember(key, value)
+        return value
+    
+    async def set(self, key: str, value: Dict[str, Any], unlock: bool = False):
+        """Store an entry, releasing the key's lock in the same round trip if ``unlock``"""
+        self._remember(key, value)
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.setex(key, self.ttl, self._encode(value))
+                if unlock:
+                    pipe.delete(f"{key}:lock")
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Prediction cache write failed: {e}")
+    
+    async def discard(self, key: str):
+        """Delete an entry from Redis"""
+        try:
+            await self.redis_client.delete(key)
+        except Exception as e:
+            logger.warning(f"Prediction cache delete failed: {e}")
+    
+    async def acquire(self, key: str) -> bool:
+        """Claim the right to compute a missing entry; other workers wait for it"""
+        try:
+            return bool(await self.redis_client.set(f"{key}:lock", b"1", nx=True, px=self.lock_timeout))
+        except Exception as e:
+            logger.warning(f"Prediction cache lock failed: {e}")
+            return True
+    
+    async def release(self, key: str):
+        try:
+            await self.redis_client.delete(f"{key}:lock")
+        except Exception as e:
+            logger.warning(f"Prediction cache unlock failed: {e}")
+    
+    async def wait(self, key: str) -> Optional[Dict[str, Any]]:
+        """Poll briefly for an entry another worker is computing"""
+        for _ in range(self.wait_attempts):
+            await asyncio.sleep(self.wait_interval)
+            cached = await self.get(key)
+            if cached is not None:
+                return cached
+        return None
+
+def redis_memoize(model_type: str):
+    """Serve an MLService prediction method from the prediction cache
+    
+    Keys include the model version that would serve the call (resolved
+    through the instance's _resolve_version when model_version is left as
+    latest), so deploying a new version stops serving the old one's cached
+    results. Hits get a fresh prediction_id and are still recorded through
+    _store_prediction, so analytics see every prediction served. Identical
+    concurrent calls within the process share a single lookup/computation
+    (single flight); Redis locking covers the same across workers. Calls
+    answered by the first lookup or by an identical in-flight call count as
+    prediction cache hits, the rest as misses.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            # Everything but the bound instance identifies the prediction
+            arguments = dict(list(bound.arguments.items())[1:])
+            
+            async def serve(cached):
+                prediction_id = str(uuid.uuid4())
+                await self._store_prediction(
+                    prediction_id, model_type, arguments.get("user_id"), arguments.get("project_id"),
+                    arguments["features"], cached["predictions"], cached["confidence_scores"]
+                )
+                return {"prediction_id": prediction_id, **cached}
+            
+            cache = self.prediction_cache
+            version = await self._resolve_version(model_type, arguments.get("model_version"))
+            key = cache.key(model_type, version, arguments)
+            pending = cache.inflight.get(key)
+            if pending is not None:
+                prediction_cache_hits.inc()
+                return await serve(await asyncio.shield(pending))
+            
+            pending = cache.inflight[key] = asyncio.get_running_loop().create_future()
+            locked = False
+            try:
+                cached = await cache.get(key)
+                if cached is not None:
+                    prediction_cache_hits.inc()
+                else:
+                    prediction_cache_misses.inc()
+                    locked = await cache.acquire(key)
+                    if not locked:
+                        cached = await cache.wait(key)
+                
+                if cached is not None:
+                    pending.set_result(cached)
+                    return await serve(cached)
+                
+                result = await func(self, *args, **kwargs)
+                cached = {name: value for name, value in result.items() if name != "prediction_id"}
+                pending.set_result(cached)
+                await cache.set(key, cached, unlock=locked)
+                locked = False
+                return result
+            except BaseException as e:
+                if not pending.done():
+                    pending.set_exception(e)
+                    # Retrieved here so an unshared failure isn't reported as unhandled
+                    pending.exception()
+                raise
+            finally:
+                del cache.inflight[key]
+                if locked:
+                    await cache.release(key)
+        
+        return wrapper
+    return decorator
@@ -1,21 +1,94 @@
+import asyncio
+import msgspec
+import orjson
 import sqlalchemy as sa
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from databases import Database
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import create_async_engine
 from .config import settings
+from .monitoring import logger
 
 # Create database URL
 DATABASE_URL = settings.DATABASE_URL
 
-# Create database instance
-database = Database(DATABASE_URL)
+# The service talks to PostgreSQL through asyncpg; Celery tasks use psycopg2
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+def _json_serializer(value) -> str:
+    """Encode JSON/JSONB parameters with orjson (numpy values and naive datetimes included)
+    
+    msgspec structs are encoded by msgspec itself, without an intermediate dict.
+    """
+    if isinstance(value, msgspec.Struct):
+        return msgspec.json.encode(value).decode()
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC).decode()
+
+# Create SQLAlchemy async engine (one connection pool per worker process;
+# see DB_POOL_SIZE for the connection budget across workers and replicas)
+engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+)
+
+# Synchronous engine for Celery tasks, which run outside any event loop.
+# Workers run one task at a time, so a small pool is enough.
+sync_engine = sa.create_engine(
+    DATABASE_URL,
+    pool_size=2,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+)
+
+def _as_statement(query):
+    """Accept both SQLAlchemy constructs and raw SQL strings"""
+    return sa.text(query) if isinstance(query, str) else query
 
-# Create SQLAlchemy engine
-engine = sa.create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+class Database:
+    """Async query interface backed by the shared SQLAlchemy engine"""
+    
+    def __init__(self, engine):
+        self.engine = engine
+    
+    async def connect(self):
+        """Open the pool and verify the database is reachable"""
+        async with self.engine.connect() as conn:
+            await conn.execute(sa.text("SELECT 1"))
+    
+    async def disconnect(self):
+        """Close all pooled connections"""
+        await self.engine.dispose()
+    
+    async def execute(self, query, values=None):
+        """Execute a statement in its own transaction"""
+        async with self.engine.begin() as conn:
+            result = await conn.execute(_as_statement(query), values)
+            return result.rowcount
+    
+    async def execute_many(self, query, values):
+        """Execute a statement for a list of parameter sets in one transaction"""
+        async with self.engine.begin() as conn:
+            await conn.execute(_as_statement(query), values)
+    
+    async def fetch_one(self, query, values=None):
+        """Execute a query and return the first row as a mapping"""
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_as_statement(query), values)
+            return result.mappings().first()
+    
+    async def fetch_all(self, query, values=None):
+        """Execute a query and return all rows as mappings"""
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_as_statement(query), values)
+            return result.mappings().all()
 
-# Create base class for models
-Base = declarative_base()
+# Create database instance
+database = Database(engine)
 
 # Create metadata
 metadata = sa.MetaData()
@@ -28,7 +101,7 @@ ml_models = sa.Table(
     sa.Column("model_type", sa.String, nullable=False),
     sa.Column("version", sa.String, nullable=False),
     sa.Column("status", sa.String, nullable=False),
-    sa.Column("performance_metrics", sa.JSON),
+    sa.Column("performance_metrics", JSONB),
     sa.Column("training_date", sa.DateTime),
     sa.Column("deployment_date", sa.DateTime),
     sa.Column("feature_names", sa.JSON),
@@ -47,7 +120,7 @@ predictions = sa.Table(
     sa.Column("model_type", sa.String, nullable=False),
     sa.Column("user_id", sa.String),
     sa.Column("project_id", sa.String),
-    sa.Column("features", sa.JSON, nullable=False),
+    sa.Column("features", JSONB, nullable=False),
     sa.Column("predictions", sa.JSON, nullable=False),
     sa.Column("confidence_scores", sa.JSON),
     sa.Column("metadata", sa.JSON),
@@ -63,7 +136,7 @@ training_jobs = sa.Table(
     sa.Column("progress", sa.Float, default=0.0),
     sa.Column("training_config", sa.JSON),
     sa.Column("hyperparameters", sa.JSON),
-    sa.Column("performance_metrics", sa.JSON),
+    sa.Column("performance_metrics", JSONB),
     sa.Column("error_message", sa.Text),
     sa.Column("results", sa.JSON),
     sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
@@ -71,6 +144,12 @@ training_jobs = sa.Table(
     sa.Column("completed_at", sa.DateTime),
 )
 
+# Indexes for the analytics and job listing queries
+sa.Index("ix_predictions_model_type_created_at", predictions.c.model_type, predictions.c.created_at)
+sa.Index("ix_predictions_user_id", predictions.c.user_id)
+sa.Index("ix_predictions_features_gin", predictions.c.features, postgresql_using="gin")
+sa.Index("ix_training_jobs_status_created_at", training_jobs.c.status, training_jobs.c.created_at)
+
 data_ingestion_jobs = sa.Table(
     "data_ingestion_jobs",
     metadata,
@@ -109,13 +188,78 @@ model_performance_logs = sa.Table(
     sa.Column("model_id", sa.String, sa.ForeignKey("ml_models.id")),
     sa.Column("model_type", sa.String, nullable=False),
     sa.Column("period", sa.String, nullable=False),
-    sa.Column("metrics", sa.JSON),
+    sa.Column("metrics", JSONB),
     sa.Column("drift_detection", sa.JSON),
     sa.Column("prediction_distribution", sa.JSON),
     sa.Column("error_analysis", sa.JSON),
     sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
 )
 
+class PredictionWriter:
+    """Coalesces prediction rows into batched inserts off the request path
+    
+    Rows are queued by the prediction endpoints and written by a single
+    background task, which collects up to ``max_batch_size`` rows (or
+    whatever arrived within ``flush_interval`` seconds) per transaction.
+    At most ``max_queue_size`` rows wait at once; beyond that, callers wait
+    for the writer instead of piling rows up in memory while the database
+    falls behind.
+    """
+    
+    def __init__(
+        self,
+        database: Database,
+        max_batch_size: int = 200,
+        flush_interval: float = 0.01,
+        max_queue_size: int = 10000
+    ):
+        self.database = database
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task = None
+    
+    async def start(self):
+        """Start the background writer task"""
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Flush everything queued so far and stop the writer"""
+        if self._task is None:
+            return
+        await self.queue.put(None)
+        await self._task
+        self._task = None
+    
+    async def enqueue(self, row: dict):
+        """Queue a prediction row for the next batch, waiting only while the queue is full"""
+        await self.queue.put(row)
+    
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            row = await self.queue.get()
+            while row is not None:
+                batch.append(row)
+                if len(batch) >= self.max_batch_size:
+                    break
+                try:
+                    row = await asyncio.wait_for(self.queue.get(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                stopping = True
+            
+            if batch:
+                await self._flush(batch)
+    
+    async def _flush(self, batch):
+        try:
+            await self.database.execute_many(predictions.insert(), batch)
+        except Exception as e:
+            logger.error(f"Failed to store {len(batch)} predictions: {e}")
+
 # Database dependency
 async def get_database():
     return database
@@ -1,139 +1,252 @@
-from typing import Any, Dict, Optional
+from types import MappingProxyType
+from typing import Any, Callable, ClassVar, Dict, List, Mapping, Optional, Tuple
+
+import orjson
+
+# Shared read-only details for exceptions raised without any
+_EMPTY_DETAILS: Mapping[str, Any] = MappingProxyType({})
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    return str(obj)
+
+def _rebuild(cls: type, message: Optional[str], status_code: int, details: Any) -> "MLServiceException":
+    # Restores from args without calling the subclass __init__, whose
+    # parameters differ from the (message, status_code, details) stored there
+    return cls.__new__(cls, message, status_code, _EMPTY_DETAILS if details is None else details)
 
 class MLServiceException(Exception):
     """Base exception for ML service errors"""
     
+    # Per class, so an exception type's status is readable without an instance
+    STATUS_CODE: ClassVar[int] = 500
+    # Message template, filled from details on first read of .message
+    _MSG: ClassVar[str] = ""
+    
     def __init__(
-        self, 
-        message: str, 
-        status_code: int = 500, 
-        details: Optional[Dict[str, Any]] = None
+        self,
+        message: Optional[str] = None,
+        status_code: Optional[int] = None,
+        details: Any = None
     ):
-        self.message = message
-        self.status_code = status_code
-        self.details = details or {}
-        super().__init__(self.message)
+        # Everything lives in args; subclasses leave message unset and it is
+        # built from details on first read
+        super().__init__(
+            message,
+            self.STATUS_CODE if status_code is None else status_code,
+            details if details else _EMPTY_DETAILS
+        )
+    
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Celery results and multiprocessing pickle exceptions
+        message, status_code, details = self.args
+        # The shared empty mapping can't be pickled; _rebuild restores it
+        details = None if details is _EMPTY_DETAILS else details
+        return _rebuild, (type(self), message, status_code, details), self.__dict__ or None
+    
+    def _format(self) -> str:
+        return self._MSG.format_map(self.details)
+    
+    @property
+    def message(self) -> str:
+        try:
+            return self._message
+        except AttributeError:
+            message = self.args[0]
+            self._message = self._format() if message is None else message
+            return self._message
+    
+    @property
+    def status_code(self) -> int:
+        return self.args[1]
+    
+    @property
+    def details(self) -> Any:
+        return self.args[2]
+    
+    @property
+    def details_json(self) -> bytes:
+        """details encoded once and shared by every sink (response body, logs)"""
+        try:
+            return self._details_json
+        except AttributeError:
+            self._details_json = orjson.dumps(
+                self.details,
+                default=_json_default,
+                option=orjson.OPT_SERIALIZE_NUMPY
+            )
+            return self._details_json
+    
+    def detach(self) -> "MLServiceException":
+        """Drop the traceback and chained exceptions so a retained error doesn't pin frames.
+        
+        Call before parking an exception somewhere long-lived, e.g. a drift or
+        performance alert queue.
+        """
+        self.__traceback__ = None
+        self.__cause__ = self.__context__ = None
+        self.__suppress_context__ = True
+        return self
+    
+    def __str__(self) -> str:
+        return self.message
 
 class ModelNotFoundError(MLServiceException):
     """Raised when a requested model is not found"""
     
-    def __init__(self, model_type: str, version: str = None):
-        message = f"Model {model_type}"
-        if version:
-            message += f" version {version}"
-        message += " not found"
-        
+    STATUS_CODE: ClassVar[int] = 404
+    
+    def __init__(self, model_type: str, version: Optional[str] = None):
         super().__init__(
-            message=message,
-            status_code=404,
             details={"model_type": model_type, "version": version}
         )
+    
+    def _format(self) -> str:
+        details = self.details
+        if details["version"]:
+            return f"Model {details['model_type']} version {details['version']} not found"
+        return f"Model {details['model_type']} not found"
 
 class InvalidFeatureError(MLServiceException):
     """Raised when invalid features are provided for prediction"""
     
-    def __init__(self, missing_features: list = None, invalid_features: list = None):
-        message = "Invalid features provided"
-        details = {}
+    STATUS_CODE: ClassVar[int] = 400
+    _MSG: ClassVar[str] = "Invalid features provided"
+    
+    def __init__(
+        self,
+        missing_features: Tuple[str, ...] = (),
+        invalid_features: Tuple[str, ...] = (),
+        rows: Optional[List[Tuple[int, List[str], List[str]]]] = None
+    ):
+        if not missing_features and not invalid_features and rows is None:
+            # Nothing to report: reuse the constant message and shared empty details
+            super().__init__(message=self._MSG)
+            return
+        
+        details: Dict[str, Any] = {}
         
         if missing_features:
-            message += f". Missing features: {', '.join(missing_features)}"
             details["missing_features"] = missing_features
-            
+        
         if invalid_features:
-            message += f". Invalid features: {', '.join(invalid_features)}"
             details["invalid_features"] = invalid_features
         
+        if rows is not None:
+            details["rows"] = rows
+        
         super().__init__(
-            message=message,
-            status_code=400,
             details=details
         )
+    
+    @classmethod
+    def from_batch(cls, row_errors: List[Tuple[int, List[str], List[str]]]) -> "InvalidFeatureError":
+        """Collapse (row, missing, invalid) errors from a batch into a single exception"""
+        return cls(
+            missing_features=tuple(sorted(set().union(*(missing for _, missing, _ in row_errors)))),
+            invalid_features=tuple(sorted(set().union(*(invalid for _, _, invalid in row_errors)))),
+            rows=row_errors
+        )
+    
+    def _format(self) -> str:
+        missing = self.details.get("missing_features")
+        invalid = self.details.get("invalid_features")
+        missing_part = f". Missing features: {', '.join(missing)}" if missing else ""
+        invalid_part = f". Invalid features: {', '.join(invalid)}" if invalid else ""
+        return f"{self._MSG}{missing_part}{invalid_part}"
 
 class TrainingJobError(MLServiceException):
     """Raised when training job fails"""
     
+    STATUS_CODE: ClassVar[int] = 500
+    _MSG: ClassVar[str] = "Training job {job_id} failed: {error}"
+    
     def __init__(self, job_id: str, error_message: str):
         super().__init__(
-            message=f"Training job {job_id} failed: {error_message}",
-            status_code=500,
             details={"job_id": job_id, "error": error_message}
         )
 
 class DataIngestionError(MLServiceException):
     """Raised when data ingestion fails"""
     
+    STATUS_CODE: ClassVar[int] = 500
+    _MSG: ClassVar[str] = "Data ingestion from {source} failed: {error}"
+    
     def __init__(self, source: str, error_message: str):
         super().__init__(
-            message=f"Data ingestion from {source} failed: {error_message}",
-            status_code=500,
             details={"source": source, "error": error_message}
         )
 
 class ModelDeploymentError(MLServiceException):
     """Raised when model deployment fails"""
     
+    STATUS_CODE: ClassVar[int] = 500
+    _MSG: ClassVar[str] = "Failed to deploy model {model_type} version {version}: {error}"
+    
     def __init__(self, model_type: str, version: str, error_message: str):
         super().__init__(
-            message=f"Failed to deploy model {model_type} version {version}: {error_message}",
-            status_code=500,
             details={"model_type": model_type, "version": version, "error": error_message}
         )
 
 class FeatureExtractionError(MLServiceException):
     """Raised when feature extraction fails"""
     
+    STATUS_CODE: ClassVar[int] = 500
+    _MSG: ClassVar[str] = "Feature extraction for {feature_type} failed: {error}"
+    
     def __init__(self, feature_type: str, error_message: str):
         super().__init__(
-            message=f"Feature extraction for {feature_type} failed: {error_message}",
-            status_code=500,
             details={"feature_type": feature_type, "error": error_message}
         )
 
 class ResourceLimitError(MLServiceException):
     """Raised when resource limits are exceeded"""
     
+    STATUS_CODE: ClassVar[int] = 429
+    _MSG: ClassVar[str] = "Resource limit exceeded for {resource_type}: {current_usage} > {limit}"
+    
     def __init__(self, resource_type: str, current_usage: float, limit: float):
         super().__init__(
-            message=f"Resource limit exceeded for {resource_type}: {current_usage} > {limit}",
-            status_code=429,
-            details={
-                "resource_type": resource_type,
-                "current_usage": current_usage,
-                "limit": limit
-            }
+            details={"resource_type": resource_type, "current_usage": current_usage, "limit": limit}
         )
 
 class ValidationError(MLServiceException):
     """Raised when data validation fails"""
     
+    STATUS_CODE: ClassVar[int] = 422
+    
     def __init__(self, validation_errors: Dict[str, str]):
-        error_messages = [f"{field}: {error}" for field, error in validation_errors.items()]
-        message = f"Validation failed: {', '.join(error_messages)}"
-        
         super().__init__(
-            message=message,
-            status_code=422,
             details={"validation_errors": validation_errors}
         )
+    
+    def _format(self) -> str:
+        # str.join over a list sizes the result up front and copies once in C,
+        # which beats both StringIO and manual bytearray assembly here
+        return "Validation failed: " + ", ".join(
+            [f"{field}: {error}" for field, error in self.details["validation_errors"].items()]
+        )
 
 class ConfigurationError(MLServiceException):
     """Raised when configuration is invalid"""
     
+    STATUS_CODE: ClassVar[int] = 500
+    _MSG: ClassVar[str] = "Configuration error for {config_item}: {error}"
+    
     def __init__(self, config_item: str, error_message: str):
         super().__init__(
-            message=f"Configuration error for {config_item}: {error_message}",
-            status_code=500,
             details={"config_item": config_item, "error": error_message}
         )
 
 class PredictionError(MLServiceException):
     """Raised when prediction fails"""
     
-    def __init__(self, model_type: str, error_message: str, features: Dict[str, Any] = None):
+    STATUS_CODE: ClassVar[int] = 500
+    _MSG: ClassVar[str] = "Prediction failed for model {model_type}: {error}"
+    
+    def __init__(self, model_type: str, error_message: str, features: Optional[Dict[str, Any]] = None):
         super().__init__(
-            message=f"Prediction failed for model {model_type}: {error_message}",
-            status_code=500,
             details={
                 "model_type": model_type,
                 "error": error_message,
@@ -142,12 +255,16 @@ class PredictionError(MLServiceException):
         )
 
 class ModelPerformanceError(MLServiceException):
-    """Raised when model performance is below acceptable thresholds"""
+    """Raised when model performance is below acceptable thresholds.
+    
+    Background monitors that queue these should call detach() first.
+    """
+    
+    STATUS_CODE: ClassVar[int] = 503
+    _MSG: ClassVar[str] = "Model {model_type} performance below threshold: {metric} = {current_value} < {threshold}"
     
     def __init__(self, model_type: str, metric: str, current_value: float, threshold: float):
         super().__init__(
-            message=f"Model {model_type} performance below threshold: {metric} = {current_value} < {threshold}",
-            status_code=503,
             details={
                 "model_type": model_type,
                 "metric": metric,
@@ -157,37 +274,51 @@ class ModelPerformanceError(MLServiceException):
         )
 
 class DataDriftError(MLServiceException):
-    """Raised when significant data drift is detected"""
+    """Raised when significant data drift is detected.
+    
+    Background monitors that queue these should call detach() first.
+    """
+    
+    STATUS_CODE: ClassVar[int] = 503
+    _MSG: ClassVar[str] = "Data drift detected for model {model_type}"
     
     def __init__(self, model_type: str, drift_details: Dict[str, Any]):
         super().__init__(
-            message=f"Data drift detected for model {model_type}",
-            status_code=503,
             details={
                 "model_type": model_type,
                 "drift_details": drift_details
             }
         )
 
+# Conversions for common built-in exceptions, keyed by exact type
+_HANDLERS: Dict[type, Callable[[Exception], MLServiceException]] = {
+    FileNotFoundError: lambda e: ModelNotFoundError("unknown", "unknown"),
+    ValueError: lambda e: ValidationError({"value": str(e)}),
+    KeyError: lambda e: InvalidFeatureError(missing_features=(str(e),)),
+}
+
 def handle_ml_exception(e: Exception) -> MLServiceException:
     """Convert generic exceptions to ML service exceptions"""
     
     if isinstance(e, MLServiceException):
         return e
     
-    # Map common exceptions
-    if isinstance(e, FileNotFoundError):
-        return ModelNotFoundError("unknown", "unknown")
-    
-    if isinstance(e, ValueError):
-        return ValidationError({"value": str(e)})
+    # Map common exceptions: exact type first, then fall back to subclasses
+    exc_class = e.__class__
+    handler = _HANDLERS.get(exc_class)
+    if handler is None:
+        for exc_type, candidate in _HANDLERS.items():
+            if isinstance(e, exc_type):
+                handler = candidate
+                break
     
-    if isinstance(e, KeyError):
-        return InvalidFeatureError(missing_features=[str(e)])
+    if handler is not None:
+        return handler(e)
     
     # Generic exception
+    original_error = str(e)
     return MLServiceException(
-        message=f"Unexpected error: {str(e)}",
+        message=f"Unexpected error: {original_error}",
         status_code=500,
-        details={"original_error": str(e), "error_type": type(e).__name__}
-    )
\ No newline at end of file
+        details={"original_error": original_error, "error_type": exc_class.__name__}
+    )
@@ -0,0 +1,371 @@
+from pathlib import Path
+from typing import Dict, Optional
+
+import lightgbm as lgb
+import numpy as np
+import sklearn
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+from .monitoring import logger
+
+try:
+    import treelite
+    import treelite.sklearn
+    import treelite_runtime
+except ImportError:  # treelite is optional; models fall back to sklearn inference
+    treelite = None
+
+try:
+    import cuml
+    from cuml import ForestInference
+except ImportError:  # cuML is optional; only CUDA hosts with GPU_ENABLED use it
+    cuml = None
+
+try:
+    import lleaves
+except ImportError:  # lleaves is optional; LightGBM models fall back to their own predict
+    lleaves = None
+
+try:
+    import numba
+    from safetensors import safe_open
+    from safetensors.numpy import save_file
+except ImportError:  # flat forests need numba and safetensors; forests fall back to their pickles
+    numba = None
+
+if numba is not None:
+    # Parallelism comes from the prediction thread pool; nogil lets batches
+    # traverse concurrently there without numba's own threading layer
+    @numba.njit(nogil=True, cache=True)
+    def _traverse(X, roots, feature, threshold, left, right, value):
+        """Average each row's leaf values over all trees"""
+        out = np.zeros((X.shape[0], value.shape[1]))
+        for i in range(X.shape[0]):
+            for root in roots:
+                node = root
+                while left[node] != -1:
+                    if X[i, feature[node]] <= threshold[node]:
+                        node = left[node]
+                    else:
+                        node = right[node]
+                out[i] += value[node]
+            out[i] /= roots.shape[0]
+        return out
+    
+    @numba.njit(nogil=True, cache=True, fastmath=True)
+    def _severity_codes(scores):
+        out = np.empty(scores.size, dtype=np.int8)
+        for i in range(scores.size):
+            magnitude = abs(scores[i])
+            out[i] = 2 if magnitude > 2.0 else (1 if magnitude > 1.0 else 0)
+        return out
+
+def severity_codes(scores) -> np.ndarray:
+    """Bucket anomaly scores by magnitude: 0 up to 1, 1 up to 2, 2 above"""
+    scores = np.ascontiguousarray(scores, dtype=np.float64)
+    if numba is not None:
+        return _severity_codes(scores)
+    magnitude = np.abs(scores)
+    return (magnitude > 1.0).astype(np.int8) + (magnitude > 2.0)
+
+def warm_up():
+    """Load (or compile) the numba kernels now rather than on the first request"""
+    if numba is not None:
+        _severity_codes(np.zeros(1))
+
+def assume_finite(predict_fn):
+    """Wrap a predict method so the input is scanned for NaN/inf once
+    
+    sklearn would otherwise repeat the scan in every step of a scaler/model
+    pipeline. The config is thread-local in sklearn, so it is entered around
+    each call rather than set once: batched predictions run on executor threads.
+    """
+    def predict(X):
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+        with sklearn.config_context(assume_finite=True):
+            return predict_fn(X)
+    return predict
+
+# Model attributes a compiled library drops, stored as arrays beside it
+_SIDECAR_ATTRIBUTES = {"classes": "classes_", "importances": "feature_importances_"}
+
+def _save_sidecars(model, libpath: Path):
+    for name, attribute in _SIDECAR_ATTRIBUTES.items():
+        sidecar = libpath.with_suffix(f".{name}.npy")
+        if hasattr(model, attribute):
+            np.save(sidecar, np.asarray(getattr(model, attribute)))
+        else:
+            sidecar.unlink(missing_ok=True)
+
+def _load_sidecars(libpath: Path) -> Dict[str, Optional[np.ndarray]]:
+    sidecars = {}
+    for name in _SIDECAR_ATTRIBUTES:
+        sidecar = libpath.with_suffix(f".{name}.npy")
+        sidecars[name] = np.load(sidecar, allow_pickle=False) if sidecar.exists() else None
+    return sidecars
+
+class TreeliteForest:
+    """sklearn-style predict/predict_proba over a Treelite-compiled forest
+    
+    Classifiers (``classes_`` set) predict the most probable class; regressors
+    predict the forest's output directly. ``feature_importances_`` is the
+    sklearn forest's, stored at compile time.
+    """
+    
+    def __init__(self, predictor, classes: Optional[np.ndarray] = None, importances: Optional[np.ndarray] = None):
+        self.predictor = predictor
+        self.classes_ = classes
+        self.feature_importances_ = importances
+    
+    def _run(self, X) -> np.ndarray:
+        return self.predictor.predict(treelite_runtime.DMatrix(np.asarray(X, dtype=np.float32)))
+    
+    def predict(self, X) -> np.ndarray:
+        if self.classes_ is None:
+            return self._run(X)
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+    
+    def predict_proba(self, X) -> np.ndarray:
+        probabilities = self._run(X)
+        # Binary classifiers only report the positive class
+        if probabilities.ndim == 1:
+            return np.column_stack([1.0 - probabilities, probabilities])
+        return probabilities
+
+def compile_forest(model, libpath: Path) -> bool:
+    """Compile a random forest to a shared library next to its pickle
+    
+    The forest's feature importances and a classifier's classes are stored
+    beside the library; classes that need pickling keep the forest on sklearn.
+    """
+    if treelite is None or not isinstance(model, (RandomForestClassifier, RandomForestRegressor)):
+        return False
+    if isinstance(model, RandomForestClassifier) and model.classes_.dtype == object:
+        return False
+    
+    try:
+        treelite.sklearn.import_model(model).export_lib(
+            toolchain="gcc", libpath=str(libpath), params={"parallel_comp": 32}, verbose=False
+        )
+        _save_sidecars(model, libpath)
+        return True
+    except Exception as e:
+        logger.warning(f"Treelite compilation failed for {libpath.name}, using sklearn: {e}")
+        return False
+
+def load_compiled_forest(libpath: Path):
+    """Load a compiled forest, or None when unavailable"""
+    if treelite is None or not libpath.exists():
+        return None
+    
+    try:
+        return TreeliteForest(treelite_runtime.Predictor(str(libpath)), **_load_sidecars(libpath))
+    except Exception as e:
+        logger.warning(f"Failed to load compiled model {libpath.name}, using sklearn: {e}")
+        return None
+
+class FlatForest:
+    """sklearn-style predict/predict_proba over a forest stored as flat node arrays
+    
+    Every tree's nodes are concatenated into one array per attribute, with
+    child indices made absolute and ``roots`` holding each tree's first node.
+    """
+    
+    def __init__(self, arrays):
+        self.roots = arrays["roots"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["children_left"]
+        self.right = arrays["children_right"]
+        self.value = arrays["value"]
+        self.classes_ = arrays.get("classes")
+        self.feature_importances_ = arrays["feature_importances"]
+    
+    def _run(self, X) -> np.ndarray:
+        return _traverse(
+            np.ascontiguousarray(X, dtype=np.float32),
+            self.roots, self.feature, self.threshold, self.left, self.right, self.value
+        )
+    
+    def predict(self, X) -> np.ndarray:
+        output = self._run(X)
+        if self.classes_ is None:
+            return output[:, 0]
+        return self.classes_[output.argmax(axis=1)]
+    
+    def predict_proba(self, X) -> np.ndarray:
+        return self._run(X)
+
+def persist_flat_forest(model, path: Path) -> bool:
+    """Store a single-output random forest as flat node arrays in safetensors"""
+    if numba is None or not isinstance(model, (RandomForestClassifier, RandomForestRegressor)) or model.n_outputs_ != 1:
+        return False
+    
+    is_classifier = isinstance(model, RandomForestClassifier)
+    # safetensors only holds numeric arrays, so string labels stay on the pickle
+    if is_classifier and model.classes_.dtype.kind not in "biuf":
+        return False
+    
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    roots = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+    
+    def children(name):
+        # Leaves keep -1; other children are offset to the tree's position
+        return np.concatenate([
+            np.where(getattr(tree, name) == -1, -1, getattr(tree, name) + root) for tree, root in zip(trees, roots)
+        ]).astype(np.int32)
+    
+    value = np.concatenate([tree.value[:, 0, :] for tree in trees])
+    if is_classifier:
+        # Leaf class counts become the per-tree probabilities sklearn averages
+        totals = value.sum(axis=1, keepdims=True)
+        value = value / np.where(totals == 0.0, 1.0, totals)
+    
+    arrays = {
+        "roots": roots.astype(np.int32),
+        "feature": np.concatenate([tree.feature for tree in trees]).astype(np.int32),
+        "threshold": np.concatenate([tree.threshold for tree in trees]),
+        "children_left": children("children_left"),
+        "children_right": children("children_right"),
+        "value": np.ascontiguousarray(value),
+        "feature_importances": model.feature_importances_
+    }
+    if is_classifier:
+        arrays["classes"] = np.asarray(model.classes_)
+    
+    try:
+        save_file(arrays, str(path))
+        return True
+    except Exception as e:
+        logger.warning(f"Failed to store flat forest {path.name}, using the pickle: {e}")
+        return False
+
+def load_flat_forest(path: Path):
+    """Load a flat forest, or None when unavailable"""
+    if numba is None or not path.exists():
+        return None
+    
+    try:
+        with safe_open(str(path), framework="np") as f:
+            return FlatForest({name: f.get_tensor(name) for name in f.keys()})
+    except Exception as e:
+        logger.warning(f"Failed to load flat forest {path.name}, using the pickle: {e}")
+        return None
+
+class FilForest:
+    """Routes large batches to a cuML FIL forest on the GPU
+    
+    Batches below ``min_rows`` rows, where the host-to-device copy costs more
+    than the traversal, and any method FIL does not provide go to the CPU
+    ``fallback`` model.
+    """
+    
+    def __init__(self, fil, fallback, min_rows: int):
+        self.fil = fil
+        self.fallback = fallback
+        self.min_rows = min_rows
+    
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+    
+    def predict(self, X) -> np.ndarray:
+        if len(X) < self.min_rows:
+            return self.fallback.predict(X)
+        with cuml.using_output_type("numpy"):
+            return self.fil.predict(np.asarray(X, dtype=np.float32))
+    
+    def predict_proba(self, X) -> np.ndarray:
+        if len(X) < self.min_rows:
+            return self.fallback.predict_proba(X)
+        with cuml.using_output_type("numpy"):
+            return self.fil.predict_proba(np.asarray(X, dtype=np.float32))
+
+def load_gpu_forest(model, min_rows: int):
+    """Load a random forest into cuML FIL, keeping the forest for small batches, or None when unavailable"""
+    if cuml is None or not isinstance(model, (RandomForestClassifier, RandomForestRegressor)):
+        return None
+    
+    try:
+        fil = ForestInference.load_from_sklearn(model, output_class=isinstance(model, RandomForestClassifier))
+        return FilForest(fil, model, min_rows)
+    except Exception as e:
+        logger.warning(f"Failed to load forest into FIL, using CPU inference: {e}")
+        return None
+
+# LightGBM regression objectives whose raw score is the prediction
+_IDENTITY_OBJECTIVES = frozenset({
+    "regression", "regression_l2", "l2", "mean_squared_error", "mse", "l2_root", "root_mean_squared_error",
+    "rmse", "regression_l1", "l1", "mean_absolute_error", "mae", "huber", "fair", "quantile", "mape",
+    "mean_absolute_percentage_error"
+})
+
+class LleavesBooster:
+    """sklearn-style predict/decision_function/predict_proba over an lleaves-compiled LightGBM model
+    
+    The library is compiled with raw_score=True, so only models whose raw
+    score maps directly onto sklearn's outputs are compiled: identity-link
+    regressors, served by predict, and binary classifiers (``classes_`` set),
+    whose margins are thresholded at zero for predict and passed through a
+    sigmoid for predict_proba. ``feature_importances_`` is the LightGBM
+    model's, stored at compile time.
+    """
+    
+    def __init__(self, model, classes: Optional[np.ndarray] = None, importances: Optional[np.ndarray] = None):
+        self.model = model
+        self.classes_ = classes
+        self.feature_importances_ = importances
+    
+    def decision_function(self, X) -> np.ndarray:
+        # Single-row batches: threading costs more than the traversal
+        return self.model.predict(np.asarray(X, dtype=np.float64), n_jobs=1)
+    
+    def predict(self, X) -> np.ndarray:
+        margins = self.decision_function(X)
+        if self.classes_ is None:
+            return margins
+        return self.classes_[(margins > 0.0).astype(np.intp)]
+    
+    def predict_proba(self, X) -> np.ndarray:
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+def compile_booster(model, libpath: Path) -> bool:
+    """Compile a LightGBM model with lleaves to a shared library next to its pickle
+    
+    The booster's text dump is kept beside the library; lleaves parses it
+    again when the library is loaded. The feature importances and a binary
+    classifier's classes are stored there too. Multiclass models, regressors with a non-identity link
+    and classes that need pickling stay on LightGBM.
+    """
+    if lleaves is None:
+        return False
+    if isinstance(model, lgb.LGBMClassifier):
+        if model.n_classes_ != 2 or model.objective_ != "binary" or model.classes_.dtype == object:
+            return False
+    elif not isinstance(model, lgb.LGBMRegressor) or model.objective_ not in _IDENTITY_OBJECTIVES:
+        return False
+    
+    model_file = libpath.with_suffix(".txt")
+    try:
+        model.booster_.save_model(str(model_file))
+        lleaves.Model(model_file=str(model_file)).compile(cache=str(libpath), raw_score=True)
+        _save_sidecars(model, libpath)
+        return True
+    except Exception as e:
+        logger.warning(f"lleaves compilation failed for {libpath.name}, using LightGBM: {e}")
+        return False
+
+def load_compiled_booster(libpath: Path):
+    """Load an lleaves-compiled model, or None when unavailable"""
+    model_file = libpath.with_suffix(".txt")
+    if lleaves is None or not libpath.exists() or not model_file.exists():
+        return None
+    
+    try:
+        model = lleaves.Model(model_file=str(model_file))
+        model.compile(cache=str(libpath), raw_score=True)
+        return LleavesBooster(model, **_load_sidecars(libpath))
+    except Exception as e:
+        logger.warning(f"Failed to load compiled model {libpath.name}, using LightGBM: {e}")
+        return None
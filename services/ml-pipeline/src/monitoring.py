@@ -1,64 +1,183 @@
 import structlog
+import atexit
+import functools
 import logging
+import logging.handlers
+import msgspec
+import os
+import queue
+import random
+import socket
 import sys
-from datetime import datetime
-from typing import Any, Dict
+import numpy as np
+import orjson
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
 from opentelemetry import trace, metrics
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.exporter.prometheus import PrometheusMetricReader
+from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from prometheus_client import Counter, Histogram, Gauge, start_http_server
+from prometheus_client import Counter, Histogram, Gauge
 from .config import settings
 
+_stack_info_renderer = structlog.processors.StackInfoRenderer()
+
+# Looked up once rather than per event; forked workers refresh the pid
+_HOSTNAME = socket.gethostname()
+_PID = os.getpid()
+
+def _refresh_pid():
+    global _PID
+    _PID = os.getpid()
+
+os.register_at_fork(after_in_child=_refresh_pid)
+
+def _add_process_info(logger, method_name, event_dict):
+    """Tag every event with the host and process that emitted it"""
+    event_dict["hostname"] = _HOSTNAME
+    event_dict["pid"] = _PID
+    return event_dict
+
+def _render_exceptions(logger, method_name, event_dict):
+    """Render stack and exception info only for events that carry them"""
+    if "stack_info" in event_dict or "exc_info" in event_dict:
+        event_dict = _stack_info_renderer(logger, method_name, event_dict)
+        event_dict = structlog.processors.format_exc_info(logger, method_name, event_dict)
+    return event_dict
+
+def _orjson_dumps(value, **kwargs) -> str:
+    """JSONRenderer serializer; stdlib handlers expect str rather than bytes"""
+    return orjson.dumps(
+        value, option=orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS, **kwargs
+    ).decode()
+
+# Records are written to stdout by a listener thread; logging call sites
+# only put the formatted record on a queue
+_log_queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+_log_listener = None
+
+def _start_log_listener():
+    """(Re)start the stdout writer; a forked child needs its own queue and thread"""
+    global _log_listener
+    _log_queue_handler.queue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(
+        _log_queue_handler.queue, logging.StreamHandler(sys.stdout), respect_handler_level=True
+    )
+    _log_listener.start()
+
+def _stop_log_listener():
+    """Flush queued records to stdout"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+# Built once; configure_logging only installs it
+_PROCESSORS = (
+    structlog.stdlib.add_logger_name,
+    structlog.stdlib.add_log_level,
+    _add_process_info,
+    structlog.processors.TimeStamper(fmt="iso"),
+    _render_exceptions,
+    structlog.processors.UnicodeDecoder(),
+    structlog.processors.JSONRenderer(serializer=_orjson_dumps)
+)
+
+def _parse_log_level(name: str) -> int:
+    """Resolve a level name such as "info", rejecting unknown names"""
+    level = logging.getLevelName(name.upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level: {name}")
+    return level
+
 # Configure structured logging
-def configure_logging():
+def configure_logging(level: int):
     """Configure structured logging with structlog"""
     
     # Configure standard library logging
     logging.basicConfig(
         format="%(message)s",
-        stream=sys.stdout,
-        level=getattr(logging, settings.LOG_LEVEL.upper()),
+        handlers=[_log_queue_handler],
+        level=level,
+        force=True,
     )
     
-    # Configure structlog
+    # Configure structlog; the filtering wrapper turns calls below the level
+    # into no-ops before any processor runs
     structlog.configure(
-        processors=[
-            structlog.stdlib.filter_by_level,
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()
-        ],
+        processors=list(_PROCESSORS),
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
-        cache_logger_on_first_use=False,
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        cache_logger_on_first_use=True,
     )
     
     return structlog.get_logger("ml-pipeline")
 
+# Started once per process, so reconfiguring logging keeps the same writer
+_start_log_listener()
+atexit.register(_stop_log_listener)
+os.register_at_fork(after_in_child=_start_log_listener)
+
 # Create logger instance
-logger = configure_logging()
+logger = configure_logging(_parse_log_level(settings.LOG_LEVEL))
+
+def refresh_level_cache():
+    """Re-read which levels are enabled; call again after reconfiguring logging"""
+    global _INFO_ENABLED, _DEBUG_ENABLED
+    stdlib_logger = logging.getLogger("ml-pipeline")
+    _INFO_ENABLED = stdlib_logger.isEnabledFor(logging.INFO)
+    _DEBUG_ENABLED = stdlib_logger.isEnabledFor(logging.DEBUG)
+
+# Logging helpers that are hot or carry large payloads check these before
+# building their event fields, so filtered events never hold on to them
+refresh_level_cache()
+
+def _log_metric_update() -> bool:
+    """Whether a per-prediction metric update should also be logged
+    
+    The metrics already carry these events, so by default they are not
+    logged; a sample can be turned on for debugging.
+    """
+    if settings.LOG_EVERY_PREDICTION:
+        return True
+    return settings.PREDICTION_LOG_SAMPLE_RATE > 0 and random.random() < settings.PREDICTION_LOG_SAMPLE_RATE
+
+# The API hands out proxies that follow the providers installed later by
+# setup_monitoring(), so these can be fetched once at import
+_TRACER = trace.get_tracer(__name__)
+_METER = metrics.get_meter(__name__)
 
 # Prometheus metrics
+#
+# Every label value must come from a bounded set, since each distinct value
+# is its own time series. Model versions are reported as deployment slots
+# (_VERSION_SLOTS, anything unmapped as "other") and ingestion sources by
+# URL scheme (_INGESTION_SOURCES, anything else as "other").
+_VERSION_SLOTS = frozenset({"current", "candidate", "previous"})
+_INGESTION_SOURCES = frozenset({"postgresql", "mysql", "s3", "gcs", "kafka", "redis", "http", "https", "file"})
+
+def _source_label(source: str) -> str:
+    scheme = source.split("://", 1)[0].lower()
+    return scheme if scheme in _INGESTION_SOURCES else "other"
+
 ml_predictions_total = Counter(
     'ml_predictions_total',
     'Total number of ML predictions made',
     ['model_type', 'status']
 )
 
+# Buckets match each histogram's latency range; the defaults (5ms-10s) are
+# too coarse for predictions and far too short for training
 ml_prediction_duration = Histogram(
     'ml_prediction_duration_seconds',
     'Time spent making ML predictions',
-    ['model_type']
+    ['model_type'],
+    buckets=(0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
 )
 
 ml_training_jobs_total = Counter(
@@ -70,13 +189,16 @@ ml_training_jobs_total = Counter(
 ml_training_duration = Histogram(
     'ml_training_duration_seconds',
     'Time spent training ML models',
-    ['model_type']
+    ['model_type'],
+    buckets=(30, 60, 120, 300, 600, 1800, 3600, 7200, 14400, 28800)
 )
 
+# In multiprocess mode a gauge reports the value most recently set by any worker
 ml_model_performance = Gauge(
     'ml_model_performance',
     'Current ML model performance metrics',
-    ['model_type', 'metric', 'version']
+    ['model_type', 'metric', 'version'],
+    multiprocess_mode='mostrecent'
 )
 
 ml_data_ingestion_records = Counter(
@@ -100,7 +222,8 @@ ml_anomaly_detection_alerts = Counter(
 ml_resource_usage = Gauge(
     'ml_resource_usage',
     'Current ML service resource usage',
-    ['resource_type']
+    ['resource_type'],
+    multiprocess_mode='mostrecent'
 )
 
 ml_cache_hits = Counter(
@@ -115,40 +238,112 @@ ml_cache_misses = Counter(
     ['cache_type']
 )
 
+# Label children of the hot metrics, resolved once per label combination
+# instead of through .labels() (validation, lock and lookup) on every call
+@functools.lru_cache(maxsize=512)
+def _prediction_children(model_type: str, status: str):
+    """Counter and duration children for one prediction, from a single lookup"""
+    return ml_predictions_total.labels(model_type, status), ml_prediction_duration.labels(model_type)
+
+@functools.lru_cache(maxsize=512)
+def _feature_extraction_child(feature_type: str):
+    return ml_feature_extraction_duration.labels(feature_type=feature_type)
+
+@functools.lru_cache(maxsize=512)
+def _resource_usage_child(resource_type: str):
+    return ml_resource_usage.labels(resource_type=resource_type)
+
+@functools.lru_cache(maxsize=512)
+def _cache_hit_child(cache_type: str):
+    return ml_cache_hits.labels(cache_type=cache_type)
+
+@functools.lru_cache(maxsize=512)
+def _cache_miss_child(cache_type: str):
+    return ml_cache_misses.labels(cache_type=cache_type)
+
+# Children for the service's own caches, bound at import; hot callers inc()
+# the exported handles directly instead of going through MLMetrics
+_CACHE_TYPES = ("prediction", "feature", "model")
+_CACHE_HIT_CHILDREN = {cache_type: _cache_hit_child(cache_type) for cache_type in _CACHE_TYPES}
+_CACHE_MISS_CHILDREN = {cache_type: _cache_miss_child(cache_type) for cache_type in _CACHE_TYPES}
+prediction_cache_hits = _CACHE_HIT_CHILDREN["prediction"]
+prediction_cache_misses = _CACHE_MISS_CHILDREN["prediction"]
+
 def setup_monitoring():
     """Setup monitoring and observability"""
     
-    # Setup OpenTelemetry tracing
-    trace.set_tracer_provider(TracerProvider())
-    tracer = trace.get_tracer(__name__)
+    # Setup OpenTelemetry tracing. Spans are exported in the background from
+    # a queue sized for prediction bursts, so recording one never waits on
+    # delivery; spans beyond a full queue are dropped.
+    provider = TracerProvider()
+    if settings.OTLP_ENDPOINT:
+        provider.add_span_processor(BatchSpanProcessor(
+            OTLPSpanExporter(endpoint=settings.OTLP_ENDPOINT),
+            max_queue_size=settings.SPAN_QUEUE_SIZE,
+            schedule_delay_millis=settings.SPAN_SCHEDULE_DELAY_MS,
+            max_export_batch_size=settings.SPAN_EXPORT_BATCH_SIZE,
+            export_timeout_millis=settings.SPAN_EXPORT_TIMEOUT_MS
+        ))
+    trace.set_tracer_provider(provider)
     
     # Setup OpenTelemetry metrics
     prometheus_reader = PrometheusMetricReader()
     metrics.set_meter_provider(MeterProvider(metric_readers=[prometheus_reader]))
     
-    # Start Prometheus metrics server
-    start_http_server(settings.PROMETHEUS_PORT)
-    
+    # Metrics are scraped from the app's own /metrics endpoint, which every
+    # uvicorn worker serves (a separate exporter port can only be bound once)
     logger.info(
         "Monitoring setup completed",
-        prometheus_port=settings.PROMETHEUS_PORT,
         log_level=settings.LOG_LEVEL
     )
     
-    return tracer
+    return _TRACER
 
 class MLMetrics:
     """ML-specific metrics collector"""
     
     def __init__(self):
-        self.tracer = trace.get_tracer(__name__)
-        self.meter = metrics.get_meter(__name__)
+        self.tracer = _TRACER
+        self.meter = _METER
+        # (model_type, version) -> slot reported as the version label
+        self.version_slots: Dict[Tuple[str, str], str] = {}
+        # Last metrics reported for each slotted version, re-reported when it changes slot
+        self.slot_performance: Dict[Tuple[str, str], Dict[str, float]] = {}
+    
+    def set_version_slot(self, model_type: str, version: str, slot: str):
+        """Report a model version's performance under a deployment slot
+        
+        The version that held the slot for this model type gives it up, and
+        metrics already reported for the version move to the new slot.
+        """
+        if slot not in _VERSION_SLOTS:
+            raise ValueError(f"Version slot must be one of {sorted(_VERSION_SLOTS)}")
+        for key, held in list(self.version_slots.items()):
+            if key[0] == model_type and held == slot and key[1] != version:
+                del self.version_slots[key]
+                self.slot_performance.pop(key, None)
+        self.version_slots[(model_type, version)] = slot
+        
+        metrics = self.slot_performance.get((model_type, version))
+        if metrics:
+            self._set_performance(model_type, slot, metrics)
+    
+    def _set_performance(self, model_type: str, slot: str, metrics: Dict[str, float]):
+        for metric_name, value in metrics.items():
+            ml_model_performance.labels(
+                model_type=model_type,
+                metric=metric_name,
+                version=slot
+            ).set(value)
         
     def record_prediction(self, model_type: str, duration: float, status: str = "success"):
         """Record prediction metrics"""
-        ml_predictions_total.labels(model_type=model_type, status=status).inc()
-        ml_prediction_duration.labels(model_type=model_type).observe(duration)
+        counter, histogram = _prediction_children(model_type, status)
+        counter.inc()
+        histogram.observe(duration)
         
+        if not _INFO_ENABLED or not _log_metric_update():
+            return
         logger.info(
             "Prediction recorded",
             model_type=model_type,
@@ -172,12 +367,14 @@ class MLMetrics:
     
     def update_model_performance(self, model_type: str, version: str, metrics: Dict[str, float]):
         """Update model performance metrics"""
-        for metric_name, value in metrics.items():
-            ml_model_performance.labels(
-                model_type=model_type,
-                metric=metric_name,
-                version=version
-            ).set(value)
+        if version in _VERSION_SLOTS:
+            slot = version
+        else:
+            slot = self.version_slots.get((model_type, version), "other")
+            if slot != "other":
+                self.slot_performance[(model_type, version)] = metrics
+        
+        self._set_performance(model_type, slot, metrics)
         
         logger.info(
             "Model performance updated",
@@ -189,7 +386,7 @@ class MLMetrics:
     def record_data_ingestion(self, source: str, data_type: str, records: int, status: str):
         """Record data ingestion metrics"""
         ml_data_ingestion_records.labels(
-            source=source,
+            source=_source_label(source),
             data_type=data_type,
             status=status
         ).inc(records)
@@ -204,8 +401,10 @@ class MLMetrics:
     
     def record_feature_extraction(self, feature_type: str, duration: float):
         """Record feature extraction metrics"""
-        ml_feature_extraction_duration.labels(feature_type=feature_type).observe(duration)
+        _feature_extraction_child(feature_type).observe(duration)
         
+        if not _INFO_ENABLED or not _log_metric_update():
+            return
         logger.info(
             "Feature extraction recorded",
             feature_type=feature_type,
@@ -219,16 +418,17 @@ class MLMetrics:
             anomaly_type=anomaly_type
         ).inc()
         
-        logger.warning(
-            "Anomaly detected",
-            severity=severity,
-            anomaly_type=anomaly_type
-        )
+        if not _event_logger.isEnabledFor(logging.WARNING):
+            return
+        event = AnomalyAlertEvent(severity=severity, anomaly_type=anomaly_type, pid=_PID, timestamp=datetime.now(timezone.utc))
+        _event_logger.warning(_event_encoder.encode(event).decode())
     
     def update_resource_usage(self, resource_type: str, usage: float):
         """Update resource usage metrics"""
-        ml_resource_usage.labels(resource_type=resource_type).set(usage)
+        _resource_usage_child(resource_type).set(usage)
         
+        if not _DEBUG_ENABLED or not _log_metric_update():
+            return
         logger.debug(
             "Resource usage updated",
             resource_type=resource_type,
@@ -237,45 +437,100 @@ class MLMetrics:
     
     def record_cache_hit(self, cache_type: str):
         """Record cache hit"""
-        ml_cache_hits.labels(cache_type=cache_type).inc()
+        (_CACHE_HIT_CHILDREN.get(cache_type) or _cache_hit_child(cache_type)).inc()
     
     def record_cache_miss(self, cache_type: str):
         """Record cache miss"""
-        ml_cache_misses.labels(cache_type=cache_type).inc()
+        (_CACHE_MISS_CHILDREN.get(cache_type) or _cache_miss_child(cache_type)).inc()
 
 # Create metrics instance
 ml_metrics = MLMetrics()
 
+# Events on the prediction path, logged without the structlog processor
+# chain; they carry the fields structlog would add, in the order it renders them.
+# msgspec encodes the UTC timestamp in the same ISO form as TimeStamper
+class PredictionRequestEvent(msgspec.Struct, kw_only=True):
+    event_type: str = "prediction_request"
+    model_type: str
+    user_id: Optional[str]
+    project_id: Optional[str]
+    feature_count: int
+    event: str = "Prediction request received"
+    logger: str = "ml-pipeline"
+    level: str = "info"
+    hostname: str = _HOSTNAME
+    pid: int
+    timestamp: datetime
+
+class PredictionResponseEvent(msgspec.Struct, kw_only=True):
+    event_type: str = "prediction_response"
+    prediction_id: str
+    model_type: str
+    confidence: float
+    duration: float
+    event: str = "Prediction completed"
+    logger: str = "ml-pipeline"
+    level: str = "info"
+    hostname: str = _HOSTNAME
+    pid: int
+    timestamp: datetime
+
+class AnomalyAlertEvent(msgspec.Struct, kw_only=True):
+    event_type: str = "anomaly_detection"
+    severity: str
+    anomaly_type: str
+    event: str = "Anomaly detected"
+    logger: str = "ml-pipeline"
+    level: str = "warning"
+    hostname: str = _HOSTNAME
+    pid: int
+    timestamp: datetime
+
+_event_encoder = msgspec.json.Encoder()
+_event_logger = logging.getLogger("ml-pipeline")
+
 class MLLogger:
-    """ML-specific structured logger"""
+    """ML-specific structured logger
+    
+    The per-prediction events are encoded straight from their structs and
+    handed to the stdlib logger.
+    """
     
     def __init__(self):
         self.logger = logger
     
     def log_prediction_request(self, model_type: str, features: Dict[str, Any], user_id: str = None, project_id: str = None):
         """Log prediction request"""
-        self.logger.info(
-            "Prediction request received",
-            event_type="prediction_request",
+        if not _INFO_ENABLED:
+            return
+        event = PredictionRequestEvent(
             model_type=model_type,
             user_id=user_id,
             project_id=project_id,
-            feature_count=len(features)
+            feature_count=len(features),
+            pid=_PID,
+            timestamp=datetime.now(timezone.utc)
         )
+        _event_logger.info(_event_encoder.encode(event).decode())
     
     def log_prediction_response(self, prediction_id: str, model_type: str, confidence: float, duration: float):
         """Log prediction response"""
-        self.logger.info(
-            "Prediction completed",
-            event_type="prediction_response",
+        if not _INFO_ENABLED:
+            return
+        event = PredictionResponseEvent(
             prediction_id=prediction_id,
             model_type=model_type,
-            confidence=confidence,
-            duration=duration
+            confidence=float(confidence),
+            duration=float(duration),
+            pid=_PID,
+            timestamp=datetime.now(timezone.utc)
         )
+        _event_logger.info(_event_encoder.encode(event).decode())
     
     def log_training_start(self, job_id: str, model_type: str, training_config: Dict[str, Any]):
         """Log training job start"""
+        if not _INFO_ENABLED:
+            return
         self.logger.info(
             "Model training started",
             event_type="training_start",
@@ -286,6 +541,8 @@ class MLLogger:
     
     def log_training_progress(self, job_id: str, model_type: str, progress: float, metrics: Dict[str, float] = None):
         """Log training progress"""
+        if not _INFO_ENABLED:
+            return
         self.logger.info(
             "Training progress update",
             event_type="training_progress",
@@ -297,6 +554,8 @@ class MLLogger:
     
     def log_training_completion(self, job_id: str, model_type: str, final_metrics: Dict[str, float], duration: float):
         """Log training completion"""
+        if not _INFO_ENABLED:
+            return
         self.logger.info(
             "Model training completed",
             event_type="training_completion",
@@ -308,6 +567,8 @@ class MLLogger:
     
     def log_model_deployment(self, model_type: str, version: str, performance_metrics: Dict[str, float]):
         """Log model deployment"""
+        if not _INFO_ENABLED:
+            return
         self.logger.info(
             "Model deployed",
             event_type="model_deployment",
@@ -318,6 +579,8 @@ class MLLogger:
     
     def log_data_ingestion(self, source: str, data_type: str, records_processed: int, duration: float):
         """Log data ingestion"""
+        if not _INFO_ENABLED:
+            return
         self.logger.info(
             "Data ingestion completed",
             event_type="data_ingestion",
@@ -363,8 +626,7 @@ ml_logger = MLLogger()
 
 def create_span(name: str, attributes: Dict[str, Any] = None):
     """Create a tracing span"""
-    tracer = trace.get_tracer(__name__)
-    span = tracer.start_span(name)
+    span = _TRACER.start_span(name)
     
     if attributes:
         for key, value in attributes.items():
@@ -392,9 +654,11 @@ class PerformanceMonitor:
         alerts = []
         status = "healthy"
         
-        for metric, value in current_metrics.items():
-            threshold = self.performance_thresholds.get(metric)
-            if threshold and value < threshold:
+        # Only thresholded metrics can alert, so walk those rather than
+        # everything the model reports
+        for metric, threshold in self.performance_thresholds.items():
+            value = current_metrics.get(metric)
+            if value is not None and value < threshold:
                 alerts.append({
                     "type": "performance_degradation",
                     "metric": metric,
@@ -413,20 +677,44 @@ class PerformanceMonitor:
             "checked_at": datetime.utcnow().isoformat()
         }
     
-    def detect_data_drift(self, model_type: str, feature_statistics: Dict[str, Any]) -> Dict[str, Any]:
-        """Detect data drift in model features"""
-        drift_detected = False
-        drift_details = {}
+    def detect_data_drift(
+        self,
+        model_type: str,
+        feature_statistics: Union[Dict[str, Any], np.ndarray],
+        feature_names: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """Detect data drift in model features
+        
+        ``feature_statistics`` maps feature names to their statistics, or is
+        an array of drift scores named by the parallel ``feature_names``; the
+        array form is compared in one vectorised step, for wide feature sets.
+        """
+        threshold = self.drift_thresholds["feature_drift"]
         
         # Simplified drift detection logic
-        for feature, stats in feature_statistics.items():
-            drift_score = stats.get("drift_score", 0.0)
-            if drift_score > self.drift_thresholds["feature_drift"]:
-                drift_detected = True
-                drift_details[feature] = {
-                    "drift_score": drift_score,
-                    "threshold": self.drift_thresholds["feature_drift"]
-                }
+        if isinstance(feature_statistics, np.ndarray):
+            if feature_names is None:
+                raise ValueError("feature_names is required when feature_statistics is an array")
+            if feature_statistics.ndim != 1 or len(feature_names) != feature_statistics.shape[0]:
+                raise ValueError(
+                    f"Expected one drift score per feature name ({len(feature_names)}), "
+                    f"got an array of shape {feature_statistics.shape}"
+                )
+            drifted = np.flatnonzero(feature_statistics > threshold)
+            drift_details = {
+                feature_names[i]: {"drift_score": score, "threshold": threshold}
+                for i, score in zip(drifted.tolist(), feature_statistics[drifted].tolist())
+            }
+        else:
+            drift_details = {}
+            for feature, stats in feature_statistics.items():
+                drift_score = stats.get("drift_score", 0.0)
+                if drift_score > threshold:
+                    drift_details[feature] = {
+                        "drift_score": drift_score,
+                        "threshold": threshold
+                    }
+        drift_detected = bool(drift_details)
         
         if drift_detected:
             ml_logger.log_error(
@@ -0,0 +1,69 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.batching import BatchedPredictor
+
+async def predict_all(predictor, rows):
+    await predictor.start()
+    try:
+        return await asyncio.gather(*(predictor.submit(row) for row in rows))
+    finally:
+        await predictor.stop()
+
+def test_each_caller_gets_its_own_row():
+    batch_sizes = []
+
+    def predict(X):
+        batch_sizes.append(len(X))
+        return X[:, 0] * 10
+
+    rows = [np.array([i, -i], dtype=np.float32) for i in range(10)]
+    predictor = BatchedPredictor(predict, max_batch_size=4, max_wait=0.05)
+    outputs = asyncio.run(predict_all(predictor, rows))
+
+    assert [float(output) for output in outputs] == [i * 10.0 for i in range(10)]
+    assert batch_sizes == [4, 4, 2]
+
+def test_batch_error_reaches_every_caller():
+    def predict(X):
+        raise ValueError("model exploded")
+
+    async def run():
+        predictor = BatchedPredictor(predict, max_batch_size=8, max_wait=0.05)
+        await predictor.start()
+        try:
+            return await asyncio.gather(
+                *(predictor.submit(np.zeros(2, dtype=np.float32)) for _ in range(3)),
+                return_exceptions=True
+            )
+        finally:
+            await predictor.stop()
+
+    results = asyncio.run(run())
+    assert len(results) == 3
+    for result in results:
+        assert isinstance(result, ValueError)
+        assert str(result) == "model exploded"
+
+def test_batcher_keeps_serving_after_an_error():
+    calls = []
+
+    def predict(X):
+        calls.append(len(X))
+        if len(calls) == 1:
+            raise ValueError("first batch fails")
+        return X.sum(axis=1)
+
+    async def run():
+        predictor = BatchedPredictor(predict, max_batch_size=1, max_wait=0.0)
+        await predictor.start()
+        try:
+            with pytest.raises(ValueError):
+                await predictor.submit(np.ones(2, dtype=np.float32))
+            return await predictor.submit(np.ones(2, dtype=np.float32))
+        finally:
+            await predictor.stop()
+
+    assert float(asyncio.run(run())) == 2.0
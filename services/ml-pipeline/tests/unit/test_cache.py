@@ -0,0 +1,103 @@
+import asyncio
+
+import fakeredis.aioredis
+
+from src.cache import PredictionCache, redis_memoize
+
+class FakeService:
+    def __init__(self, redis_client):
+        self.prediction_cache = PredictionCache(redis_client)
+        self.calls = 0
+        self.stored = []
+
+    async def _resolve_version(self, model_type, version):
+        return version or "3"
+
+    async def _store_prediction(self, prediction_id, model_type, user_id, project_id, features, predictions, confidence_scores):
+        self.stored.append(prediction_id)
+
+    @redis_memoize("user_behavior")
+    async def predict_user_behavior(self, user_id, features, model_version=None):
+        self.calls += 1
+        # Long enough for identical concurrent calls to find this one in flight
+        await asyncio.sleep(0.01)
+        return {
+            "prediction_id": f"computed-{self.calls}",
+            "predictions": {"churn_probability": features["tenure"] / 100},
+            "confidence_scores": {"churn_probability": 0.9},
+            "metadata": {"model_version": model_version or "latest"}
+        }
+
+def test_miss_computes_and_stores_entry():
+    async def run():
+        redis_client = fakeredis.aioredis.FakeRedis()
+        service = FakeService(redis_client)
+        result = await service.predict_user_behavior("u1", {"tenure": 12})
+        keys = await redis_client.keys("prediction:user_behavior:3:*")
+        return service, result, keys
+
+    service, result, keys = asyncio.run(run())
+    assert service.calls == 1
+    assert result["prediction_id"] == "computed-1"
+    assert result["predictions"] == {"churn_probability": 0.12}
+    assert len(keys) == 1
+
+def test_hit_is_served_from_redis_with_a_fresh_prediction_id():
+    async def run():
+        server = fakeredis.FakeServer()
+        first = FakeService(fakeredis.aioredis.FakeRedis(server=server))
+        computed = await first.predict_user_behavior("u1", {"tenure": 12})
+        # A second worker has an empty in-process cache, so its hit comes from Redis
+        second = FakeService(fakeredis.aioredis.FakeRedis(server=server))
+        cached = await second.predict_user_behavior("u1", {"tenure": 12})
+        return computed, second, cached
+
+    computed, second, cached = asyncio.run(run())
+    assert second.calls == 0
+    assert cached["prediction_id"] != computed["prediction_id"]
+    assert second.stored == [cached["prediction_id"]]
+    assert {**cached, "prediction_id": None} == {**computed, "prediction_id": None}
+
+def test_model_version_is_part_of_the_key():
+    async def run():
+        service = FakeService(fakeredis.aioredis.FakeRedis())
+        await service.predict_user_behavior("u1", {"tenure": 12})
+        await service.predict_user_behavior("u1", {"tenure": 12}, model_version="4")
+        return service
+
+    assert asyncio.run(run()).calls == 2
+
+def test_identical_concurrent_calls_share_one_computation():
+    async def run():
+        service = FakeService(fakeredis.aioredis.FakeRedis())
+        results = await asyncio.gather(*(service.predict_user_behavior("u1", {"tenure": 12}) for _ in range(5)))
+        return service, results
+
+    service, results = asyncio.run(run())
+    assert service.calls == 1
+    assert len({result["prediction_id"] for result in results}) == 5
+    assert all(result["predictions"] == {"churn_probability": 0.12} for result in results)
+    assert not service.prediction_cache.inflight
+
+def test_failure_reaches_concurrent_callers_and_is_not_cached():
+    class FailingService(FakeService):
+        @redis_memoize("user_behavior")
+        async def predict_user_behavior(self, user_id, features, model_version=None):
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("model unavailable")
+
+    async def run():
+        redis_client = fakeredis.aioredis.FakeRedis()
+        service = FailingService(redis_client)
+        results = await asyncio.gather(
+            *(service.predict_user_behavior("u1", {"tenure": 12}) for _ in range(3)),
+            return_exceptions=True
+        )
+        keys = await redis_client.keys("prediction:*")
+        return service, results, keys
+
+    service, results, keys = asyncio.run(run())
+    assert service.calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert keys == []
@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+from src.config import Settings
+
+SERVICE_ROOT = Path(__file__).resolve().parents[2]
+
+# Read by libraries rather than Settings
+LIBRARY_ENVIRONMENT = {"PROMETHEUS_MULTIPROC_DIR"}
+
+def k8s_environments():
+    with open(SERVICE_ROOT / "k8s" / "deployment.yaml") as f:
+        for document in yaml.safe_load_all(f):
+            if not document or document.get("kind") != "Deployment":
+                continue
+            pod = document["spec"]["template"]["spec"]
+            for container in pod.get("initContainers", []) + pod["containers"]:
+                # Secret-backed entries are not in the manifest
+                yield {entry["name"]: entry["value"] for entry in container.get("env", []) if "value" in entry}
+
+def compose_environments():
+    with open(SERVICE_ROOT / "docker-compose.yml") as f:
+        compose = yaml.safe_load(f)
+    environment = compose["services"]["ml-pipeline"]["environment"]
+    yield dict(entry.split("=", 1) for entry in environment)
+
+@pytest.mark.parametrize("environment", [*k8s_environments(), *compose_environments()])
+def test_manifest_environment_loads(monkeypatch, environment):
+    for name, value in environment.items():
+        monkeypatch.setenv(name, str(value))
+    settings = Settings(_env_file=None)
+    for name in environment.keys() - LIBRARY_ENVIRONMENT:
+        assert hasattr(settings, name), f"{name} is set in a manifest but is not a setting"
+
+def test_cors_origins_accepts_comma_separated_list(monkeypatch):
+    monkeypatch.setenv("CORS_ORIGINS", "https://zoptal.com, https://*.zoptal.com")
+    assert Settings(_env_file=None).CORS_ORIGINS == ["https://zoptal.com", "https://*.zoptal.com"]
+
+def test_cors_origins_accepts_json_list(monkeypatch):
+    monkeypatch.setenv("CORS_ORIGINS", '["https://zoptal.com"]')
+    assert Settings(_env_file=None).CORS_ORIGINS == ["https://zoptal.com"]
@@ -0,0 +1,49 @@
+import copy
+import pickle
+
+import pytest
+
+from src import exceptions
+from src.exceptions import MLServiceException
+
+EXCEPTIONS = [
+    MLServiceException("Unexpected error: boom", 500, {"original_error": "boom"}),
+    exceptions.ModelNotFoundError("user_behavior", "1"),
+    exceptions.ModelNotFoundError("user_behavior"),
+    exceptions.InvalidFeatureError(),
+    exceptions.InvalidFeatureError(missing_features=("age",), invalid_features=("plan",)),
+    exceptions.TrainingJobError("job-1", "out of memory"),
+    exceptions.DataIngestionError("s3", "timeout"),
+    exceptions.ModelDeploymentError("user_behavior", "2", "missing artifact"),
+    exceptions.FeatureExtractionError("text", "empty input"),
+    exceptions.ResourceLimitError("memory", 0.934, 0.9),
+    exceptions.ValidationError({"value": "must be positive"}),
+    exceptions.InvalidFeatureError.from_batch([(0, ["age"], []), (3, [], ["plan"])]),
+    exceptions.ConfigurationError("MODEL_STORAGE_PATH", "not writable"),
+    exceptions.PredictionError("user_behavior", "shape mismatch", {"age": 3}),
+    exceptions.ModelPerformanceError("user_behavior", "accuracy", 0.7, 0.8),
+    exceptions.DataDriftError("user_behavior", {"age": 0.4}),
+]
+
+@pytest.mark.parametrize("clone", [lambda e: pickle.loads(pickle.dumps(e)), copy.copy, copy.deepcopy])
+@pytest.mark.parametrize("error", EXCEPTIONS, ids=lambda e: type(e).__name__)
+def test_round_trip(clone, error):
+    restored = clone(error)
+    assert type(restored) is type(error)
+    assert str(restored) == str(error)
+    assert restored.status_code == error.status_code
+    assert restored.details_json == error.details_json
+
+def _exception_classes(cls):
+    yield cls
+    for subclass in cls.__subclasses__():
+        yield from _exception_classes(subclass)
+
+def test_every_exception_class_is_covered():
+    covered = {type(error) for error in EXCEPTIONS}
+    assert set(_exception_classes(MLServiceException)) == covered
+
+def test_resource_limit_details_are_a_dict():
+    error = exceptions.ResourceLimitError("memory", 0.934, 0.9)
+    assert error.details == {"resource_type": "memory", "current_usage": 0.934, "limit": 0.9}
+    assert str(error) == "Resource limit exceeded for memory: 0.934 > 0.9"
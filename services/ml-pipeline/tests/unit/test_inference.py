@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+from src import inference
+
+rng = np.random.default_rng(0)
+X = rng.normal(size=(200, 6)).astype(np.float32)
+LABELS = np.where(X[:, 0] + X[:, 1] > 0, "churn", "stay")
+TARGET = X[:, 0] * 2.0 - X[:, 2]
+
+STRING_LABELLED = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(X, LABELS)
+NUMERIC_FORESTS = [
+    RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(X, (X[:, 3] > 0).astype(int)),
+    RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(X, np.digitize(X[:, 4], [-0.5, 0.5])),
+    RandomForestRegressor(n_estimators=10, max_depth=6, random_state=0).fit(X, TARGET),
+]
+
+def assert_matches_sklearn(compiled, model):
+    if isinstance(model, RandomForestClassifier):
+        np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=1e-5, atol=1e-6)
+        np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+    else:
+        np.testing.assert_allclose(compiled.predict(X), model.predict(X), rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(compiled.feature_importances_, model.feature_importances_)
+
+@pytest.mark.parametrize("model", NUMERIC_FORESTS, ids=lambda m: type(m).__name__)
+def test_flat_forest_matches_sklearn(tmp_path, model):
+    pytest.importorskip("numba")
+    pytest.importorskip("safetensors")
+    path = tmp_path / "model.safetensors"
+    assert inference.persist_flat_forest(model, path)
+    assert_matches_sklearn(inference.load_flat_forest(path), model)
+
+def test_flat_forest_leaves_string_labels_on_the_pickle(tmp_path):
+    pytest.importorskip("numba")
+    pytest.importorskip("safetensors")
+    path = tmp_path / "model.safetensors"
+    assert not inference.persist_flat_forest(STRING_LABELLED, path)
+    assert not path.exists()
+
+@pytest.mark.parametrize("model", [*NUMERIC_FORESTS, STRING_LABELLED], ids=lambda m: type(m).__name__)
+def test_treelite_forest_matches_sklearn(tmp_path, model):
+    pytest.importorskip("treelite")
+    pytest.importorskip("treelite_runtime")
+    libpath = tmp_path / "model.so"
+    assert inference.compile_forest(model, libpath)
+    assert_matches_sklearn(inference.load_compiled_forest(libpath), model)